@@ -0,0 +1,89 @@
+import logging
+import time
+from typing import Optional
+from app.imputation.Imputer import Imputer
+
+
+class FallbackPolicy:
+    """
+    Decides when to move streams from their configured predictor to a cheaper fallback.
+
+    Load is the summed utilization (time spent per event x input rate at the source)
+    of all imputers sharing the dispatch loop. When load is above high_watermark, or
+    any stream's events are imputed more than max_lag seconds after their timestamp,
+    one eligible stream is degraded per check: streams with "priority": "low" first,
+    then the most expensive high-rate stream. Once load is below low_watermark and
+    no stream lags, degraded streams are restored one at a time if their primary
+    predictor is expected to fit back under high_watermark.
+
+    A swapped imputer starts from the cost its new predictor reports relative to
+    the old one (see Imputer.swap_predictor), and no further decision is taken
+    until it has measured settle_events events or settle_time has passed.
+    """
+    def __init__(self, high_watermark: float = 0.8, low_watermark: float = 0.5,
+                 high_rate: float = 50.0, interval: float = 1.0,
+                 settle_events: int = 10, settle_time: float = 10.0, max_lag: Optional[float] = 1.0):
+        self.high_watermark = high_watermark
+        self.low_watermark = low_watermark
+        self.high_rate = high_rate  # events/s above which any stream may be degraded
+        self.interval = interval    # seconds between decisions
+        self.settle_events = settle_events
+        self.settle_time = settle_time
+        self.max_lag = max_lag      # seconds, None to ignore lag (e.g. producers with skewed clocks)
+        self.degraded: dict[str, float] = {}  # stream_id -> event cost with the primary predictor
+        self._last_swapped: Optional[str] = None
+
+    def _settling(self, workers: dict[str, Imputer]) -> bool:
+        worker = workers.get(self._last_swapped)
+        if worker is None or worker.swapped_at is None:
+            return False
+        return (worker.events_since_swap < self.settle_events
+                and time.perf_counter() - worker.swapped_at < self.settle_time)
+
+    def _eligible(self, worker: Imputer, cfg: dict) -> bool:
+        if not cfg.get("fallback_template"):
+            return False
+        return cfg.get("priority", "normal") == "low" or worker.input_rate >= self.high_rate
+
+    def decide(self, workers: dict[str, Imputer], streams_config: dict) -> Optional[tuple[str, str]]:
+        """
+        Return ("degrade" | "restore", stream_id), or None to keep the current assignment.
+        """
+        if self._settling(workers):
+            return None
+
+        load = sum(worker.utilization for worker in workers.values())
+        lag = max((worker.lag for worker in workers.values()), default=0.0)
+        lagging = self.max_lag is not None and lag > self.max_lag
+
+        if load > self.high_watermark or lagging:
+            candidates = [
+                stream_id for stream_id, worker in workers.items()
+                if stream_id not in self.degraded and self._eligible(worker, streams_config.get(stream_id, {}))
+            ]
+            if not candidates:
+                logging.warning(f"[FALLBACK-POLICY] Load {load:.2f}, lag {lag:.2f}s but no stream left to degrade")
+                return None
+            stream_id = max(candidates, key=lambda sid: (
+                streams_config[sid].get("priority", "normal") == "low", workers[sid].utilization
+            ))
+            self.degraded[stream_id] = workers[stream_id].event_cost
+            self._last_swapped = stream_id
+            logging.info(f"[FALLBACK-POLICY] Load {load:.2f}, lag {lag:.2f}s, degrading {stream_id}")
+            return "degrade", stream_id
+
+        if load < self.low_watermark and self.degraded:
+            # Last degraded, first restored
+            stream_id = next(reversed(self.degraded))
+            worker = workers[stream_id]
+            # Only the predictor part of the per-event time changes with the swap
+            primary_cost = worker.busy_cost - worker.event_cost + self.degraded[stream_id]
+            projected = load - worker.utilization + primary_cost * worker.input_rate
+            if projected >= self.high_watermark:
+                return None
+            del self.degraded[stream_id]
+            self._last_swapped = stream_id
+            logging.info(f"[FALLBACK-POLICY] Load {load:.2f}, restoring {stream_id}")
+            return "restore", stream_id
+
+        return None
@@ -9,16 +9,76 @@ class Imputer(EventConsumer):
     Consumes observed events, predicts and updates, and immediately publishes
     events to the EventStream.
     """
-    def __init__(self, stream_id: str, predictor: BasePredictor, event_stream=None):
+    def __init__(self, stream_id: str, predictor: BasePredictor, event_stream=None,
+                 on_event=None, smoothing: float = 0.1):
         self.stream_id = stream_id
         self.predictor = predictor
         self.current_prediction = None
+        self.last_observed = None
         self.event_stream = event_stream
+        self.on_event = on_event  # called with the imputer after each event
+
+        # Smoothed load measurements, used to detect when imputation falls behind
+        self.smoothing = smoothing
+        self.busy_cost = 0.0   # seconds spent in consume_event per event
+        self.event_cost = 0.0  # part of busy_cost spent in predict/update
+        self.lag = 0.0         # seconds between an event's timestamp and its imputation
+        self._rate = 0.0       # events per second at the source, as of the last event
+        self._last_timestamp = None
+        self._last_arrival = None
+        self.swapped_at = None
+        self.events_since_swap = 0
+
+    def swap_predictor(self, predictor: BasePredictor):
+        logging.info(f"[IMPUTER-{self.stream_id}] Switching predictor {self.predictor.name} -> {predictor.name}")
+        # Until new measurements come in, scale the cost by what the predictors report
+        old_cost = self.event_cost
+        self.event_cost *= predictor.cost / self.predictor.cost
+        self.busy_cost = max(self.busy_cost + self.event_cost - old_cost, 0.0)
+        self.predictor = predictor
+        self.swapped_at = time.perf_counter()
+        self.events_since_swap = 0
+
+    def _smooth(self, current: float, sample: float) -> float:
+        return sample if current == 0.0 else self.smoothing * sample + (1 - self.smoothing) * current
+
+    def _record_load(self, event: Event, arrival: float, cost: float):
+        finished = time.perf_counter()
+        self.event_cost = self._smooth(self.event_cost, cost)
+        self.busy_cost = self._smooth(self.busy_cost, finished - arrival)
+
+        # Rate from the source timestamps: events backing up in the socket still
+        # count at the rate they were produced, not at the rate we drain them
+        timestamp = event.get("timestamp")
+        if timestamp is not None:
+            self.lag = self._smooth(self.lag, max(time.time() - timestamp, 0.0))
+        else:
+            timestamp = arrival
+        if self._last_timestamp is not None and timestamp > self._last_timestamp:
+            self._rate = self._smooth(self._rate, 1.0 / (timestamp - self._last_timestamp))
+        self._last_timestamp = timestamp
+        self._last_arrival = finished
+        self.events_since_swap += 1
+
+    @property
+    def input_rate(self) -> float:
+        # A stream that went quiet can't be faster than one event per silence
+        if self._last_arrival is None:
+            return 0.0
+        silence = time.perf_counter() - self._last_arrival
+        return min(self._rate, 1.0 / silence) if silence > 0 else self._rate
+
+    @property
+    def utilization(self) -> float:
+        # Fraction of wall time this stream needs to keep up with its input
+        return self.busy_cost * self.input_rate
 
     def consume_event(self, event: Event):
+        arrival = time.perf_counter()
         logging.debug(f"[IMPUTER-{self.stream_id}] Consuming event: {event}")
         observed_value = event.get("value")
 
+        started = time.perf_counter()
         try:
             self.current_prediction = self.predictor.predict()
         except Exception as e:
@@ -27,10 +87,12 @@ class Imputer(EventConsumer):
 
         # If we got a real observation, update predictor
         if observed_value is not None:
+            self.last_observed = observed_value
             try:
                 self.current_prediction = self.predictor.update(observed_value)
             except Exception as e:
                 logging.error(f"[IMPUTER-{self.stream_id}] Predictor.update() failed: {e}")
+        cost = time.perf_counter() - started
 
         # Build an event passed with data from the predictor
         processed: Event = dict(event)
@@ -58,3 +120,7 @@ class Imputer(EventConsumer):
         # immediately publish to eventstream
         if self.event_stream:
             self.event_stream.add_event(processed, "imputed", self.stream_id)
+
+        self._record_load(event, arrival, cost)
+        if self.on_event:
+            self.on_event(self)
@@ -1,38 +1,67 @@
 import json
 import logging
+import time
 from app.imputation.Imputer import Imputer
-from app.imputation.predictors.Predictor import KalmanFilter
+from app.imputation.FallbackPolicy import FallbackPolicy
+from app.imputation.predictors.Predictor import BasePredictor, create_predictor
 
 
 class ImputerManager:
     """
     Creates and manages imputers that consume observed events and publish imputed events.
     """
-    def __init__(self, event_stream, streams_config_path: str, filters_config_path: str):
+    def __init__(self, event_stream, streams_config_path: str, filters_config_path: str,
+                 policy: FallbackPolicy = None):
         self.event_stream = event_stream
         self.streams_config = self._load_json(streams_config_path)
         self.filters_config = self._load_json(filters_config_path)
+        self.policy = policy or FallbackPolicy()
         self.workers: dict[str, Imputer] = {}
+        self._last_check = time.monotonic()
         self._create_workers()
 
     def _load_json(self, path: str) -> dict:
         with open(path, "r") as f:
             return json.load(f)
 
-    def _create_predictor(self, filter_template: str):
+    def _create_predictor(self, filter_template: str, initial_value=None) -> BasePredictor:
         cfg = self.filters_config.get(filter_template)
-        ftype = cfg["type"]
-        params = cfg["params"]
+        if cfg is None:
+            raise ValueError(f"Unknown filter template: {filter_template}")
+        params = dict(cfg.get("params", {}))
 
-        if ftype == "KalmanFilter":
-            return KalmanFilter(**params)
+        # Seed predictors swapped in mid-stream with the latest observation
+        if initial_value is not None:
+            params["initial_value"] = initial_value
+        return create_predictor(cfg["type"], params)
 
     def _create_workers(self):
         for stream_id, cfg in self.streams_config.items():
             predictor = self._create_predictor(cfg.get("filter_template"))
-            worker = Imputer(stream_id=stream_id, predictor=predictor, event_stream=self.event_stream)
+            worker = Imputer(stream_id=stream_id, predictor=predictor, event_stream=self.event_stream,
+                             on_event=self._on_event)
             self.workers[stream_id] = worker
 
             # Subscribe worker to observed.<id>
             self.event_stream.subscribe(worker, "observed", stream_id)
             logging.info(f"[IMPUTER-MANAGER] Worker for {stream_id} subscribed to observed.{stream_id}")
+
+    def _on_event(self, worker: Imputer):
+        now = time.monotonic()
+        if now - self._last_check >= self.policy.interval:
+            self._last_check = now
+            self.rebalance()
+
+    def rebalance(self):
+        """
+        Apply one fallback policy decision, swapping a stream's predictor if needed.
+        """
+        decision = self.policy.decide(self.workers, self.streams_config)
+        if decision is None:
+            return
+
+        action, stream_id = decision
+        cfg = self.streams_config[stream_id]
+        template = cfg["fallback_template"] if action == "degrade" else cfg["filter_template"]
+        worker = self.workers[stream_id]
+        worker.swap_predictor(self._create_predictor(template, initial_value=worker.last_observed))
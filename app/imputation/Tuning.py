@@ -0,0 +1,311 @@
+#!/usr/bin/env python
+import argparse
+import ast
+import itertools
+import json
+import logging
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+"""
+Offline tuning of KalmanFilter templates against recorded streams.
+
+Recorded series are loaded once from a Logger CSV, then every stream is replayed
+through a whole batch of candidate filters at once (one BatchKalmanFilter row per
+parameter set and dropout mask). Streams are spread across a process pool and the
+best parameters per stream type are written out as filters.json templates.
+
+Run with 'python -m app.imputation.Tuning --csv app/data/logs/test.csv'.
+"""
+
+TUNED_PARAMS = ("process_noise", "measurement_noise", "initial_variance")
+
+DEFAULT_RANGES = {
+    "process_noise": (1e-4, 10.0),
+    "measurement_noise": (1e-3, 10.0),
+    "initial_variance": (1e-2, 100.0),
+}
+
+KALMAN_DEFAULTS = {
+    "initial_value": 0.0,
+    "initial_rate": 0.0,
+    "initial_acceleration": 0.0,
+    "initial_variance": 1.0,
+    "dt": 1.0,
+    "process_noise": 0.01,
+    "measurement_noise": 0.1,
+}
+
+
+class BatchKalmanFilter:
+    """
+    N independent KalmanFilter instances advanced in lockstep with numpy.
+
+    Shares the transition model (dt) but each row has its own noise, variance
+    and observation mask, so one replay of a series scores N candidates.
+    """
+    def __init__(self, process_noise, measurement_noise, initial_variance,
+                 initial_value=0.0, initial_rate=0.0, initial_acceleration=0.0, dt=1.0):
+        process_noise = np.asarray(process_noise, dtype=float)
+        n = process_noise.shape[0]
+
+        self.state = np.tile([initial_value, initial_rate, initial_acceleration], (n, 1)).astype(float)
+        self.P = np.eye(3)[None, :, :] * np.asarray(initial_variance, dtype=float).reshape(n, 1, 1)
+        self.Q = np.eye(3)[None, :, :] * process_noise.reshape(n, 1, 1)
+        self.R = np.asarray(measurement_noise, dtype=float).reshape(n)
+        self.F = np.array([
+            [1, dt, 0.5 * dt**2],
+            [0, 1, dt],
+            [0, 0, 1]
+        ])
+
+    def predict(self) -> np.ndarray:
+        self.state = self.state @ self.F.T
+        self.P = self.F @ self.P @ self.F.T + self.Q
+        return self.state[:, 0].copy()
+
+    def update(self, observed_value: float, observed: np.ndarray) -> np.ndarray:
+        """
+        Update the rows where observed is True with the same measurement.
+        """
+        y = observed_value - self.state[:, 0]
+        S = self.P[:, 0, 0] + self.R
+        K = self.P[:, :, 0] / S[:, None]
+
+        state = self.state + K * y[:, None]
+        P = self.P - K[:, :, None] * self.P[:, None, 0, :]
+
+        self.state = np.where(observed[:, None], state, self.state)
+        self.P = np.where(observed[:, None, None], P, self.P)
+        return self.state[:, 0].copy()
+
+
+def load_series(csv_path: str) -> dict[str, dict[str, np.ndarray]]:
+    """
+    Read a Logger CSV into per-stream arrays of observed values and ground truth.
+    """
+    df = pd.read_csv(csv_path)
+    df = df[df["partition"] == "observed"].sort_values("timestamp")
+
+    if "extras" in df.columns:
+        extras = df["extras"].apply(
+            lambda x: ast.literal_eval(x) if isinstance(x, str) and x.strip() else {}
+        )
+        df = df.assign(ground_truth=extras.apply(lambda d: d.get("ground_truth", np.nan)))
+    else:
+        df = df.assign(ground_truth=np.nan)
+
+    series = {}
+    for stream_id, group in df.groupby("stream_id"):
+        observed = group["observed_value"].to_numpy(dtype=float)
+        truth = group["ground_truth"].to_numpy(dtype=float)
+        # Without ground truth the observed value is the best reference we have
+        truth = np.where(np.isnan(truth), observed, truth)
+        series[stream_id] = {"observed": observed, "truth": truth}
+    return series
+
+
+def make_masks(observed: np.ndarray, n_masks: int, dropout: float, seed: int = 0) -> np.ndarray:
+    """
+    Observation masks (True = value seen by the filter) of shape (n_masks + 1, T).
+
+    Row 0 is the dropout pattern recorded in the log, the others additionally
+    hide random observations at the given dropout rate.
+    """
+    rng = np.random.default_rng(seed)
+    recorded = ~np.isnan(observed)
+    synthetic = recorded & (rng.random((n_masks, observed.shape[0])) >= dropout)
+    return np.vstack([recorded, synthetic])
+
+
+def grid_candidates(points: int, ranges: dict = DEFAULT_RANGES) -> list[dict]:
+    axes = [np.geomspace(*ranges[name], num=points) for name in TUNED_PARAMS]
+    return [dict(zip(TUNED_PARAMS, map(float, values))) for values in itertools.product(*axes)]
+
+
+def random_candidates(samples: int, ranges: dict = DEFAULT_RANGES, seed: int = 0) -> list[dict]:
+    # Log-uniform, the noise terms span several orders of magnitude
+    rng = np.random.default_rng(seed)
+    columns = {
+        name: np.exp(rng.uniform(np.log(ranges[name][0]), np.log(ranges[name][1]), samples))
+        for name in TUNED_PARAMS
+    }
+    return [{name: float(columns[name][i]) for name in TUNED_PARAMS} for i in range(samples)]
+
+
+def replay(observed: np.ndarray, masks: np.ndarray, candidates: list[dict], base_params: dict) -> np.ndarray:
+    """
+    Replay a series the way Imputer does and return imputed values of shape (C, M, T).
+    """
+    n_candidates, n_masks = len(candidates), masks.shape[0]
+    columns = {
+        name: np.repeat([c[name] for c in candidates], n_masks) for name in TUNED_PARAMS
+    }
+    fixed = {k: v for k, v in base_params.items() if k not in TUNED_PARAMS}
+    kf = BatchKalmanFilter(**columns, **fixed)
+
+    seen = np.tile(masks, (n_candidates, 1))
+    predictions = np.empty(seen.shape)
+    for t, value in enumerate(observed):
+        predictions[:, t] = kf.predict()
+        if seen[:, t].any():
+            kf.update(value, seen[:, t])
+    return predictions.reshape(n_candidates, n_masks, -1)
+
+
+def score(truth: np.ndarray, masks: np.ndarray, predictions: np.ndarray) -> dict[str, np.ndarray]:
+    """
+    MAE, RMSE and R2 per candidate over all imputed positions of all masks.
+    """
+    # Only hidden positions with a known answer can be scored
+    hidden = ~masks & ~np.isnan(truth)
+    y_true = np.broadcast_to(truth, masks.shape)[hidden]
+    y_pred = predictions[:, hidden]
+
+    errors = y_pred - y_true
+    mse = np.mean(errors**2, axis=1)
+    total = np.sum((y_true - y_true.mean())**2)
+    r2 = 1.0 - np.sum(errors**2, axis=1) / total if total > 0 else np.full(mse.shape, np.nan)
+    return {
+        "count": np.full(mse.shape, y_true.size),
+        "MAE": np.mean(np.abs(errors), axis=1),
+        "RMSE": np.sqrt(mse),
+        "R2": r2,
+    }
+
+
+def tune_stream(stream_id: str, series: dict, candidates: list[dict], base_params: dict,
+                n_masks: int = 8, dropout: float = 0.3, batch_size: int = 256,
+                seed: int = 0) -> pd.DataFrame:
+    """
+    Score every candidate on one stream, in batches of batch_size candidates.
+    """
+    observed, truth = series["observed"], series["truth"]
+    masks = make_masks(observed, n_masks, dropout, seed)
+    if not (~masks & ~np.isnan(truth)).any():
+        logging.warning(f"[TUNER] {stream_id} has no scorable dropouts, skipping")
+        return pd.DataFrame()
+
+    frames = []
+    for start in range(0, len(candidates), batch_size):
+        batch = candidates[start:start + batch_size]
+        metrics = score(truth, masks, replay(observed, masks, batch, base_params))
+        frame = pd.DataFrame(batch)
+        for name, values in metrics.items():
+            frame[name] = values
+        frames.append(frame)
+
+    results = pd.concat(frames, ignore_index=True)
+    results.insert(0, "candidate", range(len(results)))
+    results.insert(0, "stream_id", stream_id)
+    logging.info(f"[TUNER] Scored {len(candidates)} candidates on {stream_id}")
+    return results
+
+
+def _base_params(cfg: dict, filters_config: dict) -> dict:
+    template = filters_config.get(cfg.get("filter_template"), {})
+    params = dict(KALMAN_DEFAULTS)
+    if template.get("type") == "KalmanFilter":
+        params.update(template.get("params", {}))
+    return params
+
+
+def tune(csv_path: str, streams_config: dict, filters_config: dict, candidates: list[dict],
+         n_masks: int = 8, dropout: float = 0.3, batch_size: int = 256,
+         workers: int = None, seed: int = 0) -> tuple[dict, pd.DataFrame]:
+    """
+    Tune all recorded streams and return (filters config with tuned templates, scores).
+
+    Candidates are ranked by mean RMSE over the streams of each stream type, and
+    the winner is added as a "tuned-<stream_type>" template. Only the tuned
+    parameters change, the rest is kept from the base template the candidates were
+    scored with. Streams of one type on different base templates are tuned
+    separately as "tuned-<stream_type>-<filter_template>".
+    """
+    series = load_series(csv_path)
+
+    jobs = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for stream_id, data in series.items():
+            cfg = streams_config.get(stream_id, {})
+            jobs[stream_id] = pool.submit(
+                tune_stream, stream_id, data, candidates, _base_params(cfg, filters_config),
+                n_masks, dropout, batch_size, seed,
+            )
+        frames = [job.result() for job in jobs.values()]
+
+    scores = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    if scores.empty:
+        return dict(filters_config), scores
+
+    scores["stream_type"] = scores["stream_id"].map(
+        lambda sid: streams_config.get(sid, {}).get("stream_type", sid)
+    )
+    scores["filter_template"] = scores["stream_id"].map(
+        lambda sid: streams_config.get(sid, {}).get("filter_template") or ""
+    )
+
+    tuned = dict(filters_config)
+    for (stream_type, filter_template), group in scores.groupby(["stream_type", "filter_template"]):
+        name = f"tuned-{stream_type}"
+        if scores.loc[scores["stream_type"] == stream_type, "filter_template"].nunique() > 1:
+            logging.warning(f"[TUNER] {stream_type} streams use different base templates, tuning each separately")
+            name = f"{name}-{filter_template}"
+
+        ranking = group.groupby("candidate")[["MAE", "RMSE", "R2"]].mean().sort_values("RMSE")
+        best = candidates[ranking.index[0]]
+
+        stream_id = group["stream_id"].iloc[0]
+        params = _base_params(streams_config.get(stream_id, {}), filters_config)
+        params.update(best)
+
+        tuned[name] = {"type": "KalmanFilter", "params": params}
+        logging.info(
+            f"[TUNER] Best for {name}: {best} "
+            f"(MAE={ranking.iloc[0]['MAE']:.4f}, RMSE={ranking.iloc[0]['RMSE']:.4f}, R2={ranking.iloc[0]['R2']:.4f})"
+        )
+    return tuned, scores
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--csv", default="app/data/logs/test.csv", help="Logger CSV with recorded streams")
+    parser.add_argument("--streams", default="app/configs/streams.json")
+    parser.add_argument("--filters", default="app/configs/filters.json")
+    parser.add_argument("--output", default="app/data/results/tuned_filters.json")
+    parser.add_argument("--scores", default="app/data/results/tuning_scores.csv")
+    parser.add_argument("--search", choices=["grid", "random"], default="random")
+    parser.add_argument("--grid-points", type=int, default=8, help="Values per parameter for grid search")
+    parser.add_argument("--samples", type=int, default=512, help="Parameter sets for random search")
+    parser.add_argument("--masks", type=int, default=8, help="Synthetic dropout masks per stream")
+    parser.add_argument("--dropout", type=float, default=0.3)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-log", "--log", default="info")
+    options = parser.parse_args()
+
+    logging.basicConfig(format='[%(levelname)s] %(message)s', level=options.log.upper())
+
+    with open(options.streams, "r") as f:
+        streams_config = json.load(f)
+    with open(options.filters, "r") as f:
+        filters_config = json.load(f)
+
+    if options.search == "grid":
+        candidates = grid_candidates(options.grid_points)
+    else:
+        candidates = random_candidates(options.samples, seed=options.seed)
+
+    tuned, scores = tune(
+        options.csv, streams_config, filters_config, candidates,
+        n_masks=options.masks, dropout=options.dropout, batch_size=options.batch_size,
+        workers=options.workers, seed=options.seed,
+    )
+
+    with open(options.output, "w") as f:
+        json.dump(tuned, f, indent=2)
+    scores.to_csv(options.scores, index=False)
+    print(f"Wrote {options.output}")
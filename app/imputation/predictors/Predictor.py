@@ -1,8 +1,27 @@
 from abc import ABC, abstractmethod
+from collections import deque
 import numpy as np
 
 
+# Predictor types usable as "type" in filters.json
+PREDICTORS: dict[str, type["BasePredictor"]] = {}
+
+
+def register_predictor(cls):
+    PREDICTORS[cls.__name__] = cls
+    return cls
+
+
+def create_predictor(ftype: str, params: dict) -> "BasePredictor":
+    if ftype not in PREDICTORS:
+        raise ValueError(f"Unknown predictor type: {ftype}")
+    return PREDICTORS[ftype](**params)
+
+
 class BasePredictor(ABC):
+    # Approximate per-event (predict + update) cost, relative to one KalmanFilter step
+    cost: float = 1.0
+
     def __init__(self, name: str):
         self.name = name
 
@@ -19,6 +38,7 @@ class BasePredictor(ABC):
         pass
 
 
+@register_predictor
 class KalmanFilter(BasePredictor):
     def __init__(self, initial_value=0.0, initial_rate=0.0,
                  initial_acceleration=0.0, initial_variance=1.0,
@@ -65,3 +85,104 @@ class KalmanFilter(BasePredictor):
     def get_rate(self): return self.state[1, 0]
     def get_acceleration(self): return self.state[2, 0]
     def get_covariance(self): return self.P
+
+
+@register_predictor
+class LastValuePredictor(BasePredictor):
+    """
+    Repeats the last observation, confidence decays with every missed value.
+    """
+    cost = 0.01
+
+    def __init__(self, initial_value=0.0, decay=0.1):
+        super().__init__(name="last")
+        self.value = initial_value
+        self.decay = decay
+        self.missed = 0
+
+    def predict(self) -> float:
+        self.missed += 1
+        return self.value
+
+    def update(self, observed_value: float) -> float:
+        self.value = observed_value
+        self.missed = 0
+        return self.value
+
+    def confidence(self) -> float:
+        return 1.0 / (1.0 + self.decay * self.missed)
+
+
+@register_predictor
+class EWMAPredictor(BasePredictor):
+    """
+    Exponentially weighted moving average of the observations.
+    """
+    cost = 0.02
+
+    def __init__(self, initial_value=0.0, alpha=0.3, decay=0.1):
+        super().__init__(name="ewma")
+        self.value = initial_value
+        self.alpha = alpha
+        self.decay = decay
+        self.missed = 0
+
+    def predict(self) -> float:
+        self.missed += 1
+        return self.value
+
+    def update(self, observed_value: float) -> float:
+        self.value = self.alpha * observed_value + (1 - self.alpha) * self.value
+        self.missed = 0
+        return self.value
+
+    def confidence(self) -> float:
+        return 1.0 / (1.0 + self.decay * self.missed)
+
+
+@register_predictor
+class LinearExtrapolationPredictor(BasePredictor):
+    """
+    Least-squares line through the last `window` observations, extrapolated one step per event.
+    """
+    cost = 0.1
+
+    def __init__(self, initial_value=0.0, window=8, decay=0.1):
+        super().__init__(name="linear")
+        self.buffer = deque(maxlen=window)  # (step, value)
+        self.step = 0
+        self.value = initial_value
+        self.decay = decay
+        self.missed = 0
+
+    def _extrapolate(self) -> float:
+        n = len(self.buffer)
+        if n == 0:
+            return self.value
+        if n == 1:
+            return self.buffer[0][1]
+
+        sx = sy = sxx = sxy = 0.0
+        for x, y in self.buffer:
+            sx += x
+            sy += y
+            sxx += x * x
+            sxy += x * y
+        slope = (n * sxy - sx * sy) / (n * sxx - sx * sx)
+        intercept = (sy - slope * sx) / n
+        return intercept + slope * self.step
+
+    def predict(self) -> float:
+        self.step += 1
+        self.missed += 1
+        self.value = self._extrapolate()
+        return self.value
+
+    def update(self, observed_value: float) -> float:
+        self.buffer.append((self.step, observed_value))
+        self.value = observed_value
+        self.missed = 0
+        return self.value
+
+    def confidence(self) -> float:
+        return 1.0 / (1.0 + self.decay * self.missed)
@@ -8,8 +8,11 @@ Generic stream client component.
 """
 
 class Client:
-    def __init__(self, prefix: str):
+    def __init__(self, prefix: str, namespace: str = "sots"):
         self.prefix = prefix
+        # Topic prefix of TCP copies of events that shared memory rings of this namespace
+        # already delivered on this host, so ring subscribers can filter them out in ZeroMQ
+        self.mirror_prefix = f"{prefix}~{namespace}"
         self._ctx = zmq.Context.instance()
         self._subscriber = self._ctx.socket(zmq.SUB)
         self._publisher = self._ctx.socket(zmq.PUSH)
@@ -23,24 +26,50 @@ class Client:
         self._poller.register(self._subscriber, zmq.POLLIN)
 
         self.subscribers: dict[str, list[EventConsumer]] = {}
+        self.mirror_subscribers: dict[str, list[EventConsumer]] = {}
 
-    def publish(self, event: Event, stream_id: str):
+    @property
+    def socket(self) -> zmq.Socket:
+        # Readable when dispatch_once has something to deliver
+        return self._subscriber
+
+    def _wire_topic(self, stream_id: str, mirror: bool) -> str:
+        return f"{self.mirror_prefix if mirror else self.prefix}.{stream_id}"
+
+    def publish(self, event: Event, stream_id: str, mirror: bool = False):
         topic = f"{self.prefix}.{stream_id}"
         event["__topic__"] = topic
         payload = json.dumps(event).encode("utf-8")
-        self._publisher.send_multipart([topic.encode("utf-8"), payload])
+        self._publisher.send_multipart([self._wire_topic(stream_id, mirror).encode("utf-8"), payload])
         logging.debug(f"[{self.prefix.upper()}-CLIENT] Published event to {topic}: {event}")
 
-    def subscribe_to(self, stream_id: str, consumer: EventConsumer):
+    def publish_batch(self, events: list[Event], stream_id: str, mirror: bool = False):
+        # One message carrying a JSON array, subscribers decode it back into single events
+        topic = f"{self.prefix}.{stream_id}"
+        for event in events:
+            event["__topic__"] = topic
+        payload = json.dumps(events).encode("utf-8")
+        self._publisher.send_multipart([self._wire_topic(stream_id, mirror).encode("utf-8"), payload])
+        logging.debug(f"[{self.prefix.upper()}-CLIENT] Published batch of {len(events)} events to {topic}")
+
+    def subscribe_to(self, stream_id: str, consumer: EventConsumer, mirrors: bool = True):
+        """
+        mirrors: also receive TCP copies of shared memory events, off for consumers reading the rings
+        """
         if stream_id == "*":
-            prefix = f"{self.prefix}."
-            self._subscriber.setsockopt_string(zmq.SUBSCRIBE, prefix)
+            self._subscriber.setsockopt_string(zmq.SUBSCRIBE, f"{self.prefix}.")
+            if mirrors:
+                self._subscriber.setsockopt_string(zmq.SUBSCRIBE, f"{self.mirror_prefix}.")
             topic = f"{self.prefix}.*"
         else:
             topic = f"{self.prefix}.{stream_id}"
             self._subscriber.setsockopt_string(zmq.SUBSCRIBE, topic)
+            if mirrors:
+                self._subscriber.setsockopt_string(zmq.SUBSCRIBE, self._wire_topic(stream_id, True))
 
         self.subscribers.setdefault(topic, []).append(consumer)
+        if mirrors:
+            self.mirror_subscribers.setdefault(topic, []).append(consumer)
         logging.info(f"[{self.prefix.upper()}-CLIENT] Subscribed {consumer.__class__.__name__} to {topic}")
 
     def dispatch_once(self, timeout: int = 1000):
@@ -49,16 +78,24 @@ class Client:
         if self._subscriber in items:
             topic, payload = self._subscriber.recv_multipart()
             topic = topic.decode("utf-8")
-            event = json.loads(payload.decode("utf-8"))
-            event["__topic__"] = topic
+            decoded = json.loads(payload.decode("utf-8"))
+            events = decoded if isinstance(decoded, list) else [decoded]
+
+            subscribers = self.subscribers
+            if topic.startswith(f"{self.mirror_prefix}."):
+                topic = f"{self.prefix}.{topic[len(self.mirror_prefix) + 1:]}"
+                subscribers = self.mirror_subscribers
+
+            for event in events:
+                event["__topic__"] = topic
 
-            # Exact match
-            if topic in self.subscribers:
-                for consumer in self.subscribers[topic]:
-                    consumer.consume_event(event)
+                # Exact match
+                if topic in subscribers:
+                    for consumer in subscribers[topic]:
+                        consumer.consume_event(event)
 
-            # Wildcard
-            wildcard = f"{self.prefix}.*"
-            if wildcard in self.subscribers:
-                for consumer in self.subscribers[wildcard]:
-                    consumer.consume_event(event)
+                # Wildcard
+                wildcard = f"{self.prefix}.*"
+                if wildcard in subscribers:
+                    for consumer in subscribers[wildcard]:
+                        consumer.consume_event(event)
@@ -1,35 +1,148 @@
 import logging
+import threading
+import time
+import zmq
 from app.schema.Event import Event, EventConsumer
 from app.messaging.Client import Client
+from app.messaging.SharedMemoryClient import SharedMemoryClient, RecordTooLarge, RingBusy
+
 
 class EventStream:
-    def __init__(self):
+    def __init__(self, shared_memory: bool = False, mirror_tcp: bool = True, batch_size: int = 1,
+                 batch_partitions: tuple = ("imputed",), max_linger_ms: int = 50,
+                 namespace: str = "sots", slot_size: int = 1024, doorbell_dir: str = "/tmp"):
+        """
+        shared_memory: exchange events with same-host processes through shared memory rings
+        mirror_tcp: with shared_memory, still publish over TCP so TCP-only consumers (e.g. the Java CEP)
+            receive events. Copies go out under a separate topic that ring subscribers don't subscribe to
+        batch_size: TCP events per message for batch_partitions (meant for imputed -> Esper)
+        max_linger_ms: pending batches are sent at the latest after this long
+        namespace: shared memory ring names are "<namespace>-<partition>"
+        slot_size: bytes per ring record, larger events are sent over TCP only
+        doorbell_dir: directory of the rings' doorbell sockets and owner lock files
+        """
         self.partitions = {
-            "observed": Client("observed"),
-            "imputed": Client("imputed"),
-            "matched": Client("matched"),
+            "observed": Client("observed", namespace=namespace),
+            "imputed": Client("imputed", namespace=namespace),
+            "matched": Client("matched", namespace=namespace),
         }
+        self.local_partitions: dict[str, SharedMemoryClient] = {}
+        if shared_memory:
+            self.local_partitions = {
+                partition: SharedMemoryClient(partition, namespace=namespace, slot_size=slot_size,
+                                              doorbell_dir=doorbell_dir)
+                for partition in self.partitions
+            }
+        self.mirror_tcp = mirror_tcp or not shared_memory
+        self._ring_busy: set[str] = set()  # partitions another process produces to, sent over TCP
+        self.batch_size = batch_size
+        self.batch_partitions = set(batch_partitions) if batch_size > 1 else set()
+        self.max_linger_ms = max_linger_ms
+        self._batches: dict[tuple[str, str, bool], list[Event]] = {}  # (partition, stream_id, mirror)
+        # Batched partitions only publish under this lock, from add_event or the flusher
+        self._batch_lock = threading.Lock()
+        self._flusher_stop = threading.Event()
+        self._flusher = None
+        if self.batch_partitions:
+            self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+            self._flusher.start()
         self._running = False
 
     def add_event(self, event: Event, partition: str, stream_id: str):
         if partition not in self.partitions:
             raise ValueError(f"Unknown partition: {partition}")
         logging.debug(f"[EVENTSTREAM] Adding event to {partition}.{stream_id}: {event}")
-        self.partitions[partition].publish(event, stream_id)
+        mirror = False
+        if partition in self.local_partitions:
+            try:
+                self.local_partitions[partition].publish(event, stream_id)
+            except RecordTooLarge as e:
+                logging.warning(f"[EVENTSTREAM] {e}, sending {partition}.{stream_id} event over TCP only")
+            except RingBusy as e:
+                if partition not in self._ring_busy:
+                    self._ring_busy.add(partition)
+                    logging.warning(f"[EVENTSTREAM] {e}, sending {partition} events over TCP only")
+            else:
+                if partition in self._ring_busy:
+                    self._ring_busy.discard(partition)
+                    logging.info(f"[EVENTSTREAM] Took over ring for {partition}")
+                if not self.mirror_tcp:
+                    return
+                # Local subscribers already got it through the ring
+                mirror = True
+        if partition not in self.batch_partitions:
+            self.partitions[partition].publish(event, stream_id, mirror=mirror)
+            return
+
+        key = (partition, stream_id, mirror)
+        with self._batch_lock:
+            batch = self._batches.setdefault(key, [])
+            batch.append(event)
+            if len(batch) >= self.batch_size:
+                self.partitions[partition].publish_batch(self._batches.pop(key), stream_id, mirror=mirror)
+
+    def flush(self):
+        with self._batch_lock:
+            for (partition, stream_id, mirror), batch in self._batches.items():
+                self.partitions[partition].publish_batch(batch, stream_id, mirror=mirror)
+            self._batches.clear()
+
+    def _flush_loop(self):
+        # Independent of dispatch(), so producer-only processes send partial batches too
+        while not self._flusher_stop.wait(self.max_linger_ms / 1000):
+            self.flush()
 
     def subscribe(self, consumer: EventConsumer, partition: str, stream_id: str):
         if partition not in self.partitions:
             raise ValueError(f"Unknown partition: {partition}")
-        self.partitions[partition].subscribe_to(stream_id, consumer)
+        if partition not in self.local_partitions:
+            self.partitions[partition].subscribe_to(stream_id, consumer)
+            return
+
+        # Same-host producers arrive through the ring, everything else (TCP-only producers
+        # like the Java CEP, oversized events, a second producer process) through TCP.
+        # Mirrored copies of ring events are filtered out by ZeroMQ, they are never received.
+        self.local_partitions[partition].subscribe_to(stream_id, consumer)
+        self.partitions[partition].subscribe_to(stream_id, consumer, mirrors=False)
 
     def dispatch(self, timeout: int = 1000, once: bool = False):
         self._running = True
+        poller, registered = None, []
         while self._running:
-            for client in self.partitions.values():
-                client.dispatch_once(timeout=timeout)
+            # Clients nobody subscribed to never deliver anything, don't poll them
+            active = [
+                client for client in [*self.partitions.values(), *self.local_partitions.values()]
+                if client.subscribers
+            ]
+            if not active:
+                time.sleep(timeout / 1000)
+            else:
+                if active != registered:
+                    # One poller over every socket, so a quiet one never holds back the others
+                    poller = zmq.Poller()
+                    for client in active:
+                        poller.register(client.socket, zmq.POLLIN)
+                    registered = active
+                rings = [client for client in active if isinstance(client, SharedMemoryClient)]
+                # Arms every ring's doorbell, don't sleep if one already holds events
+                pending = [client.ready() for client in rings]
+                ready = dict(poller.poll(0 if any(pending) else timeout))
+                for client in active:
+                    # Rings are drained every tick, which also checks for restarted producers
+                    if client.socket in ready or client in rings:
+                        client.dispatch_once(timeout=0)
             if once:
                 break
 
     def stop(self):
         logging.info("[EVENTSTREAM] Stopping dispatch loop.")
         self._running = False
+
+    def close(self):
+        # Sends pending batches and releases shared memory rings, call once dispatching has stopped
+        if self._flusher is not None:
+            self._flusher_stop.set()
+            self._flusher.join()
+        self.flush()
+        for client in self.local_partitions.values():
+            client.close()
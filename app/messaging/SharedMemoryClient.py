@@ -0,0 +1,399 @@
+import fcntl
+import json
+import logging
+import os
+import struct
+import threading
+import time
+from multiprocessing import resource_tracker, shared_memory
+from typing import Optional
+
+import zmq
+from app.schema.Event import Event, EventConsumer
+
+"""
+Same-host stream client component.
+
+Events are written into a single-producer/multi-consumer ring of fixed-size
+records held in shared memory. Each record carries a sequence number, so
+readers never take a lock: they copy a slot and re-check its sequence to detect
+that the producer lapped them. A ZeroMQ PUB/SUB doorbell over IPC wakes readers
+up instead of having them spin on the ring. It is only rung when a reader armed
+it before going to sleep, so a burst of writes costs one doorbell message.
+
+A ring has one producer process, enforced with an flock on a lock file next to
+the doorbell. Every producer start gets a new generation number, so readers can
+tell a restarted producer apart from the one they attached to.
+"""
+
+MAGIC = b"SOTS"
+VERSION = 3
+
+# magic, version, slot_size, capacity, write_seq, generation, closed, doorbell armed
+HEADER = struct.Struct("<4sIIIQQII")
+HEADER_SIZE = 64
+WRITE_SEQ_OFFSET = 16
+GENERATION_OFFSET = 24
+CLOSED_OFFSET = 32
+ARMED_OFFSET = 36
+SEQ = struct.Struct("<Q")
+FLAG = struct.Struct("<I")
+
+# seq, topic length, payload length
+SLOT_HEADER = struct.Struct("<QHI")
+
+
+class RingOverrun(Exception):
+    """Raised when a reader fell more than one ring capacity behind the producer."""
+
+
+class RingBusy(Exception):
+    """Raised when another live process already produces to the ring."""
+
+
+class RecordTooLarge(ValueError):
+    """Raised when an event does not fit in one ring slot."""
+
+
+class RingNotReady(Exception):
+    """Raised when a producer has created the segment but not finished setting it up."""
+
+
+class SharedRing:
+    """
+    Fixed-size event records in a multiprocessing.shared_memory segment.
+
+    Sequence numbers start at 1; a slot whose sequence is 0 (or stale) has not
+    been published yet. Only one process may write to a ring: create=True must
+    only be used while holding the ring's owner lock (see SharedMemoryClient).
+    """
+    def __init__(self, name: str, capacity: int = 4096, slot_size: int = 1024, create: bool = False):
+        if slot_size <= SLOT_HEADER.size:
+            raise ValueError(f"slot_size must be larger than {SLOT_HEADER.size} bytes")
+        self.name = name
+        self.capacity = capacity
+        self.slot_size = slot_size
+        self.owner = create
+
+        size = HEADER_SIZE + capacity * slot_size
+        if create:
+            try:
+                self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+            except FileExistsError:
+                # Segment left behind by a producer that died without unlinking it.
+                # The caller holds the owner lock, so nobody is writing to it anymore.
+                logging.warning(f"[SHM-RING] Reclaiming stale segment {name}")
+                stale = shared_memory.SharedMemory(name=name)
+                stale.close()
+                stale.unlink()
+                self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+            self.generation = time.time_ns()
+            # Magic goes in last: readers treat a segment without it as still being set up
+            # Armed from the start: readers may already wait for the first write
+            HEADER.pack_into(self._shm.buf, 0, bytes(4), VERSION, slot_size, capacity, 0, self.generation, 0, 1)
+            self._shm.buf[0:4] = MAGIC
+        else:
+            try:
+                self._shm = shared_memory.SharedMemory(name=name)
+            except ValueError:
+                # Created but not sized yet, mmap refuses empty files
+                raise RingNotReady(name)
+            # Readers must not unlink the producer's segment when they exit
+            resource_tracker.unregister(self._shm._name, "shared_memory")
+            magic, version, self.slot_size, self.capacity, _, self.generation, _, _ = HEADER.unpack_from(self._shm.buf, 0)
+            if magic != MAGIC or version != VERSION:
+                self._shm.close()
+                if magic == bytes(4):
+                    raise RingNotReady(name)
+                raise ValueError(f"Segment {name} is not a version {VERSION} event ring")
+
+        self._buf = self._shm.buf
+        self._max_record = self.slot_size - SLOT_HEADER.size
+
+    @property
+    def write_seq(self) -> int:
+        return SEQ.unpack_from(self._buf, WRITE_SEQ_OFFSET)[0]
+
+    @property
+    def closed(self) -> bool:
+        # Set by the producer right before it unlinks the segment
+        return FLAG.unpack_from(self._buf, CLOSED_OFFSET)[0] != 0
+
+    def arm(self):
+        # Called by a reader before it sleeps on the doorbell
+        FLAG.pack_into(self._buf, ARMED_OFFSET, 1)
+
+    def disarm(self) -> bool:
+        """
+        Called by the producer after a write. True if a reader waits for a doorbell.
+        """
+        if FLAG.unpack_from(self._buf, ARMED_OFFSET)[0] == 0:
+            return False
+        FLAG.pack_into(self._buf, ARMED_OFFSET, 0)
+        return True
+
+    def _slot_offset(self, seq: int) -> int:
+        return HEADER_SIZE + ((seq - 1) % self.capacity) * self.slot_size
+
+    def write(self, topic: bytes, payload: bytes) -> int:
+        if len(topic) + len(payload) > self._max_record:
+            raise RecordTooLarge(
+                f"Record of {len(topic) + len(payload)} bytes exceeds slot capacity of {self._max_record}"
+            )
+        seq = self.write_seq + 1
+        offset = self._slot_offset(seq)
+
+        # Invalidate the slot first so a reader copying it notices the overwrite
+        SEQ.pack_into(self._buf, offset, 0)
+        start = offset + SLOT_HEADER.size
+        self._buf[start:start + len(topic)] = topic
+        self._buf[start + len(topic):start + len(topic) + len(payload)] = payload
+        SLOT_HEADER.pack_into(self._buf, offset, seq, len(topic), len(payload))
+        SEQ.pack_into(self._buf, WRITE_SEQ_OFFSET, seq)
+        return seq
+
+    def read(self, seq: int) -> Optional[tuple[bytes, bytes]]:
+        """
+        Return (topic, payload) for seq, or None if it has not been written yet.
+        """
+        offset = self._slot_offset(seq)
+        slot_seq, topic_len, payload_len = SLOT_HEADER.unpack_from(self._buf, offset)
+        if slot_seq != seq:
+            # Already published but the slot no longer holds it: overwritten
+            if slot_seq > seq or seq <= self.write_seq:
+                raise RingOverrun(seq)
+            return None
+
+        start = offset + SLOT_HEADER.size
+        topic = bytes(self._buf[start:start + topic_len])
+        payload = bytes(self._buf[start + topic_len:start + topic_len + payload_len])
+
+        # Producer may have lapped us while copying
+        if SEQ.unpack_from(self._buf, offset)[0] != seq:
+            raise RingOverrun(seq)
+        return topic, payload
+
+    def close(self):
+        if self.owner:
+            FLAG.pack_into(self._buf, CLOSED_OFFSET, 1)
+        self._buf = None
+        self._shm.close()
+        if self.owner:
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+class SharedMemoryClient:
+    """
+    Drop-in counterpart of Client for consumers on the same host as the producer.
+    """
+    def __init__(self, prefix: str, namespace: str = "sots", capacity: int = 4096,
+                 slot_size: int = 1024, doorbell_dir: str = "/tmp", probe_interval: float = 1.0):
+        self.prefix = prefix
+        self.ring_name = f"{namespace}-{prefix}"
+        self.capacity = capacity
+        self.slot_size = slot_size
+        self.doorbell_endpoint = f"ipc://{doorbell_dir}/{self.ring_name}.doorbell"
+        self.lock_path = os.path.join(doorbell_dir, f"{self.ring_name}.lock")
+
+        self._ctx = zmq.Context.instance()
+        self._producer: Optional[SharedRing] = None
+        self._doorbell_pub = None
+        self._lock_file = None
+        self._write_lock = threading.Lock()  # serializes threads of the one producer process
+        self._busy_until = 0.0  # while another process owns the ring, don't retry the lock before this
+
+        self._reader: Optional[SharedRing] = None
+        self._cursor = 0
+        self._waiting = False
+        self.probe_interval = probe_interval  # min seconds between checks for a restarted producer
+        self._last_probe = 0.0
+        self._doorbell = self._ctx.socket(zmq.SUB)
+        self._doorbell.linger = 0
+        self._doorbell.setsockopt(zmq.SUBSCRIBE, b"")
+        self._doorbell.connect(self.doorbell_endpoint)
+        self._poller = zmq.Poller()
+        self._poller.register(self._doorbell, zmq.POLLIN)
+
+        self.subscribers: dict[str, list[EventConsumer]] = {}
+
+    def _open_producer(self):
+        # The kernel drops the flock when the holder exits, so a crashed producer never blocks a restart
+        self._lock_file = open(self.lock_path, "a")
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            self._lock_file.close()
+            self._lock_file = None
+            raise RingBusy(f"Another process already produces to ring {self.ring_name}")
+
+        self._producer = SharedRing(self.ring_name, self.capacity, self.slot_size, create=True)
+        self._doorbell_pub = self._ctx.socket(zmq.PUB)
+        self._doorbell_pub.linger = 0
+        self._doorbell_pub.bind(self.doorbell_endpoint)
+        logging.info(f"[{self.prefix.upper()}-SHM-CLIENT] Producing to ring {self.ring_name}")
+
+    def _open_reader(self) -> bool:
+        if self._reader is None:
+            if self._producer is not None:
+                ring = self._producer
+            else:
+                try:
+                    ring = SharedRing(self.ring_name)
+                except (FileNotFoundError, RingNotReady):
+                    # Everything the producer writes from now on is after we joined
+                    self._cursor = 0
+                    self._waiting = True
+                    return False
+            # Like PUB/SUB, only events published after joining are delivered
+            self._cursor = 0 if self._waiting else ring.write_seq
+            self._reader = ring
+        return True
+
+    def _reopen_if_replaced(self):
+        """
+        Switch to a new segment if the producer restarted since we attached.
+
+        A restarted producer always creates a fresh segment under the same name,
+        so the mapping we hold goes quiet for good. Reopening by name and comparing
+        generations detects this.
+        """
+        if self._reader is None or self._reader is self._producer:
+            return
+        try:
+            current = SharedRing(self.ring_name)
+        except (FileNotFoundError, RingNotReady):
+            # Gone or still being set up by a restarting producer, try again later
+            current = None
+
+        if current is not None and current.generation == self._reader.generation:
+            current.close()
+            return
+
+        logging.info(f"[{self.prefix.upper()}-SHM-CLIENT] Producer of {self.ring_name} restarted, reattaching")
+        self._reader.close()
+        self._reader = current
+        # Every event of the new producer was published after we joined
+        self._cursor = 0
+        self._waiting = current is None
+
+    def publish(self, event: Event, stream_id: str):
+        """
+        Raises RecordTooLarge if the encoded event does not fit in one slot, and
+        RingBusy if another process produces to the ring (retried every probe_interval).
+        """
+        topic = f"{self.prefix}.{stream_id}"
+        event["__topic__"] = topic
+        payload = json.dumps(event).encode("utf-8")
+        with self._write_lock:
+            if self._producer is None:
+                if time.monotonic() < self._busy_until:
+                    raise RingBusy(f"Another process already produces to ring {self.ring_name}")
+                try:
+                    self._open_producer()
+                except RingBusy:
+                    self._busy_until = time.monotonic() + self.probe_interval
+                    raise
+            self._producer.write(topic.encode("utf-8"), payload)
+            if self._producer.disarm():
+                self._doorbell_pub.send(b"", zmq.NOBLOCK)
+        logging.debug(f"[{self.prefix.upper()}-SHM-CLIENT] Published event to {topic}: {event}")
+
+    def subscribe_to(self, stream_id: str, consumer: EventConsumer):
+        topic = f"{self.prefix}.*" if stream_id == "*" else f"{self.prefix}.{stream_id}"
+        self.subscribers.setdefault(topic, []).append(consumer)
+        self._open_reader()
+        logging.info(f"[{self.prefix.upper()}-SHM-CLIENT] Subscribed {consumer.__class__.__name__} to {topic}")
+
+    def _deliver(self, topic: str, event: Event):
+        if topic in self.subscribers:
+            for consumer in self.subscribers[topic]:
+                consumer.consume_event(event)
+
+        wildcard = f"{self.prefix}.*"
+        if wildcard in self.subscribers:
+            for consumer in self.subscribers[wildcard]:
+                consumer.consume_event(event)
+
+    def _drain(self) -> int:
+        ring = self._reader
+        delivered = 0
+        while self._cursor < ring.write_seq:
+            try:
+                record = ring.read(self._cursor + 1)
+            except RingOverrun:
+                # Jump to the oldest slot that is safe from the next write
+                skip_to = max(ring.write_seq - ring.capacity + 1, self._cursor + 1)
+                logging.warning(
+                    f"[{self.prefix.upper()}-SHM-CLIENT] Reader overrun, dropped {skip_to - self._cursor} events"
+                )
+                self._cursor = skip_to
+                continue
+            if record is None:
+                break
+            self._cursor += 1
+
+            topic = record[0].decode("utf-8")
+            event = json.loads(record[1])
+            event["__topic__"] = topic
+            self._deliver(topic, event)
+            delivered += 1
+        return delivered
+
+    @property
+    def socket(self) -> zmq.Socket:
+        # Readable when the producer rang the doorbell, see ready() for events already in the ring
+        return self._doorbell
+
+    def ready(self) -> bool:
+        """
+        Arm the doorbell, and return True if the ring already holds undelivered events.
+        """
+        if not self._open_reader():
+            return False
+        self._reader.arm()
+        # Checked after arming: a concurrent write either sees the flag and rings, or is
+        # seen here. Without a memory fence this is best effort, the poll timeout bounds a miss.
+        return self._cursor < self._reader.write_seq or self._reader.closed
+
+    def dispatch_once(self, timeout: int = 1000):
+        # processes one poll tick
+        items = dict(self._poller.poll(0 if self.ready() else timeout))
+        if self._doorbell in items:
+            # Doorbells only signal "something new", drain them all at once
+            while True:
+                try:
+                    self._doorbell.recv(zmq.NOBLOCK)
+                except zmq.Again:
+                    break
+        # Read even without a doorbell, a ring joined late may already hold events
+        if not self._open_reader():
+            return
+
+        # The producer sets closed after its last write, so checking first means the drain sees everything
+        closed = self._reader.closed
+        idle = self._drain() == 0
+        now = time.monotonic()
+        if closed or (idle and now - self._last_probe >= self.probe_interval):
+            # Quiet or closed ring: the producer may have restarted on a new segment
+            self._last_probe = now
+            self._reopen_if_replaced()
+            if self._reader is not None:
+                self._drain()
+
+    def close(self):
+        self._poller.unregister(self._doorbell)
+        self._doorbell.close()
+        if self._reader is not None and self._reader is not self._producer:
+            self._reader.close()
+        if self._producer is not None:
+            self._producer.close()
+            # Wake readers up so they notice the closed ring right away
+            self._doorbell_pub.send(b"", zmq.NOBLOCK)
+            self._doorbell_pub.unbind(self.doorbell_endpoint)
+            self._doorbell_pub.close()
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+            self._lock_file.close()
+        self._reader = self._producer = self._lock_file = None
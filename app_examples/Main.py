@@ -25,6 +25,7 @@ def main():
         event_stream.dispatch(timeout=1000)
     except KeyboardInterrupt:
         event_stream.stop()
+        event_stream.close()
         logger.close()
         logging.info("[MAIN] Stopping pipeline")
 
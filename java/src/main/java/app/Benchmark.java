@@ -0,0 +1,190 @@
+package app;
+
+import cep.CEPManager;
+import cep.EsperFeeder;
+import cep.EsperSetup;
+import com.google.gson.Gson;
+import event.Event;
+import messaging.EventStream;
+import messaging.StreamClient;
+import org.zeromq.ZMQ;
+import patterns.PatternLoader;
+
+import java.nio.charset.StandardCharsets;
+import java.util.ArrayList;
+import java.util.LinkedHashMap;
+import java.util.List;
+import java.util.Map;
+import java.util.concurrent.atomic.AtomicLong;
+import java.util.concurrent.locks.LockSupport;
+
+/**
+ * End-to-end CEP ingestion throughput. Events are published on a ZeroMQ PUB socket the way
+ * the Python server forwards them, received by StreamClient and EventStream, queued by
+ * CEPManager into EsperFeeder, and matches are published back on a PUSH socket.
+ * Compares one JSON event per frame against JSON array frames of batchSize events per stream.
+ *
+ * Run with 'java -cp target/sots-uncertainty-aware-cep-0.0.1-SNAPSHOT.jar app.Benchmark [events] [batchSize] [port]'.
+ * Uses ports port (PUB), port + 1 (match sink) and port + 2 (unused snapshot endpoint).
+ */
+public class Benchmark {
+    private static final Gson GSON = new Gson();
+    private static final int STREAMS = 8;
+    private static final String EPL = "@name('HighValueEvent') select * from Event where value > 25.0";
+
+    public static void main(String[] args) throws Exception {
+        int total = args.length > 0 ? Integer.parseInt(args[0]) : 1_000_000;
+        int batchSize = args.length > 1 ? Integer.parseInt(args[1]) : 256;
+        int port = args.length > 2 ? Integer.parseInt(args[2]) : 5600;
+
+        List<Frame> singles = new ArrayList<>(total);
+        List<Frame> batches = new ArrayList<>();
+        Map<String, List<Event>> pending = new LinkedHashMap<>();
+        for (int i = 0; i < total; i++) {
+            Event event = sample(i);
+            byte[] topic = ("imputed." + event.stream_id).getBytes(StandardCharsets.UTF_8);
+            singles.add(new Frame(topic, GSON.toJson(event).getBytes(StandardCharsets.UTF_8), 1));
+
+            List<Event> batch = pending.computeIfAbsent(event.stream_id, k -> new ArrayList<>(batchSize));
+            batch.add(event);
+            if (batch.size() == batchSize) {
+                batches.add(new Frame(topic, GSON.toJson(batch).getBytes(StandardCharsets.UTF_8), batch.size()));
+                batch.clear();
+            }
+        }
+        for (Map.Entry<String, List<Event>> entry : pending.entrySet()) {
+            if (entry.getValue().isEmpty()) continue;
+            byte[] topic = ("imputed." + entry.getKey()).getBytes(StandardCharsets.UTF_8);
+            batches.add(new Frame(topic, GSON.toJson(entry.getValue()).getBytes(StandardCharsets.UTF_8), entry.getValue().size()));
+        }
+
+        report("single", run(singles, total, port));
+        report("batched(" + batchSize + ")", run(batches, total, port));
+    }
+
+    private static Event sample(int i) {
+        Event event = new Event();
+        event.stream_id = "temp-" + (i % STREAMS);
+        event.timestamp = i;
+        event.datatype = "float";
+        event.unit = "C";
+        event.value = 15.0 + (i % 150) / 10.0;
+        event.observed_value = event.value;
+        event.method = "observed";
+        event.confidence = 1.0;
+        return event;
+    }
+
+    private record Frame(byte[] topic, byte[] payload, int events) {}
+
+    private record Result(int events, long nanos, long missing, long blocked, long matchFrames) {}
+
+    private static Result run(List<Frame> frames, int total, int port) throws Exception {
+        ZMQ.Context context = ZMQ.context(1);
+        ZMQ.Socket pub = context.socket(ZMQ.PUB);
+        pub.setLinger(0);
+        pub.setSndHWM(0); // measure throughput, not drops at the high-water mark
+        pub.bind("tcp://127.0.0.1:" + port);
+        ZMQ.Socket sink = context.socket(ZMQ.PULL);
+        sink.setLinger(0);
+        sink.bind("tcp://127.0.0.1:" + (port + 1));
+
+        StreamClient client = new StreamClient("tcp://127.0.0.1:" + (port + 2),
+            "tcp://127.0.0.1:" + port, "tcp://127.0.0.1:" + (port + 1));
+        EventStream eventStream = new EventStream(client);
+        EsperSetup esper = new EsperSetup();
+        PatternLoader loader = new PatternLoader(esper.getConfiguration(), esper.getRuntime(), eventStream);
+        loader.loadPattern(EPL, "HighValueEvent");
+        EsperFeeder feeder = new EsperFeeder(esper.getRuntime());
+        CEPManager cep = new CEPManager(eventStream, feeder);
+        cep.onBatchProcessed(loader::flushMatches);
+        cep.start();
+
+        Thread receiver = new Thread(client::subscribe, "receiver");
+        receiver.start();
+
+        AtomicLong matchFrames = new AtomicLong();
+        Thread sinkThread = new Thread(() -> {
+            while (!Thread.currentThread().isInterrupted()) {
+                byte[] topic = sink.recv(ZMQ.DONTWAIT);
+                if (topic == null) {
+                    LockSupport.parkNanos(1_000_000);
+                    continue;
+                }
+                sink.recv(0);
+                matchFrames.incrementAndGet();
+            }
+        }, "match-sink");
+        sinkThread.start();
+
+        // Until a probe goes through, PUB drops frames for the not yet connected subscriber
+        Event probe = sample(0);
+        byte[] probeFrame = GSON.toJson(probe).getBytes(StandardCharsets.UTF_8);
+        while (feeder.getProcessed() == 0) {
+            pub.sendMore("imputed." + probe.stream_id);
+            pub.send(probeFrame);
+            Thread.sleep(10);
+        }
+
+        // Warm up the JIT on the same path, then measure
+        int warmup = Math.max(1, frames.size() / 10);
+        long base = feeder.getProcessed();
+        long warmupEvents = send(pub, frames.subList(0, warmup));
+        awaitProcessed(feeder, base + warmupEvents);
+        Thread.sleep(200); // stray probes
+        base = feeder.getProcessed();
+
+        long start = System.nanoTime();
+        send(pub, frames);
+        long missing = awaitProcessed(feeder, base + total);
+        long elapsed = System.nanoTime() - start;
+        long blocked = feeder.getBlocked();
+
+        eventStream.stopReceiving();
+        receiver.join();
+        cep.stop();
+        loader.stop();
+        eventStream.stop();
+        sinkThread.interrupt();
+        sinkThread.join();
+        sink.close();
+        pub.close();
+        context.term();
+        esper.getRuntime().destroy();
+        return new Result(total, elapsed, missing, blocked, matchFrames.get());
+    }
+
+    private static long send(ZMQ.Socket pub, List<Frame> frames) {
+        long events = 0;
+        for (Frame frame : frames) {
+            pub.sendMore(frame.topic());
+            pub.send(frame.payload());
+            events += frame.events();
+        }
+        return events;
+    }
+
+    /** Wait until the feeder processed target events, returns how many never arrived. */
+    private static long awaitProcessed(EsperFeeder feeder, long target) {
+        long last = -1;
+        long lastProgress = System.nanoTime();
+        while (feeder.getProcessed() < target) {
+            long processed = feeder.getProcessed();
+            if (processed != last) {
+                last = processed;
+                lastProgress = System.nanoTime();
+            } else if (System.nanoTime() - lastProgress > 5_000_000_000L) {
+                return target - processed;
+            }
+            LockSupport.parkNanos(100_000);
+        }
+        return 0;
+    }
+
+    private static void report(String name, Result result) {
+        double seconds = result.nanos() / 1e9;
+        System.out.printf("%-14s %,d events in %.3f s -> %,.0f events/s (missing %,d, blocked submits %,d, match frames %,d)%n",
+            name, result.events(), seconds, result.events() / seconds,
+            result.missing(), result.blocked(), result.matchFrames());
+    }
+}
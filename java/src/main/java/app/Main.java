@@ -22,14 +22,19 @@ public class Main {
 
         // Load all patterns from config file
         loader.loadPatternsFromFile("patterns.json");
-        // Start pipeline
-        cep.start();
-        eventStream.start();
+        cep.onBatchProcessed(loader::flushMatches);
+        loader.startFlushTimer(100);
 
-        // Graceful shutdown
+        // Graceful shutdown: stop input, drain Esper and publish the last matches, then close
         Runtime.getRuntime().addShutdownHook(new Thread(() -> {
+            eventStream.stopReceiving();
+            cep.stop();
+            loader.stop();
             eventStream.stop();
-            client.close();
         }));
+
+        // Start pipeline
+        cep.start();
+        eventStream.start();
     }
 }
@@ -3,30 +3,42 @@ package cep;
 import com.espertech.esper.runtime.client.*;
 import event.Event;
 import messaging.EventStream;
+import java.util.List;
 import java.util.logging.Logger;
 
 public class CEPManager {
     private static final Logger LOG = Logger.getLogger(CEPManager.class.getName());
 
     private final EventStream eventStream;
-    private final EPRuntime runtime;
+    private final EsperFeeder feeder;
 
     public CEPManager(EventStream eventStream, EPRuntime runtime) {
+        this(eventStream, new EsperFeeder(runtime));
+    }
+
+    public CEPManager(EventStream eventStream, EsperFeeder feeder) {
         this.eventStream = eventStream;
-        this.runtime = runtime;
+        this.feeder = feeder;
+    }
+
+    /** Hook run on the Esper thread after each batch, e.g. to flush matched events. */
+    public void onBatchProcessed(Runnable hook) {
+        feeder.setAfterBatch(hook);
     }
 
     public void start() {
-        eventStream.subscribe("imputed", "*", this::handleEvent);
+        feeder.start();
+        eventStream.subscribeBatch("imputed", "*", this::handleEvents);
 
         LOG.info("[CEPManager] Subscribed to imputed partition");
     }
 
-    private void handleEvent(Event event) {
-        try {
-            runtime.getEventService().sendEventBean(event, "Event"); 
-        } catch (Exception e) {
-            LOG.warning("[CEPManager] Failed to send event to Esper: " + e.getMessage());
-        }
+    public void stop() {
+        feeder.stop();
+    }
+
+    private void handleEvents(List<Event> events) {
+        // Esper is fed from the feeder thread, this only queues
+        feeder.submitAll(events);
     }
 }
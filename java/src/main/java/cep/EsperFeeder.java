@@ -0,0 +1,158 @@
+package cep;
+
+import com.espertech.esper.runtime.client.EPEventService;
+import com.espertech.esper.runtime.client.EPRuntime;
+import event.Event;
+import java.util.ArrayList;
+import java.util.List;
+import java.util.concurrent.ArrayBlockingQueue;
+import java.util.concurrent.BlockingQueue;
+import java.util.concurrent.TimeUnit;
+import java.util.concurrent.atomic.AtomicLong;
+import java.util.logging.Logger;
+
+/**
+ * Feeds Esper from a bounded queue on a dedicated thread, so decoding on the
+ * messaging thread and pattern matching overlap.
+ *
+ * A full queue blocks the messaging thread. Incoming frames then pile up in the
+ * SUB socket until its receive high-water mark, after which the server's PUB
+ * socket silently drops frames for this subscriber. Blocked submits are counted
+ * and logged so a sustained overload is visible.
+ */
+public class EsperFeeder implements Runnable {
+    private static final Logger LOG = Logger.getLogger(EsperFeeder.class.getName());
+
+    private final BlockingQueue<Event> queue;
+    private final EPEventService eventService;
+    private final int drainSize;
+    private final AtomicLong processed = new AtomicLong();
+    private final AtomicLong blocked = new AtomicLong();
+
+    // Runs on the feeder thread after every drained batch
+    private Runnable afterBatch = () -> {};
+
+    private volatile boolean running = false;
+    private Thread thread;
+
+    public EsperFeeder(EPRuntime runtime) {
+        this(runtime, 65536, 1024);
+    }
+
+    public EsperFeeder(EPRuntime runtime, int capacity, int drainSize) {
+        this.queue = new ArrayBlockingQueue<>(capacity);
+        this.eventService = runtime.getEventService();
+        this.drainSize = drainSize;
+    }
+
+    public void setAfterBatch(Runnable afterBatch) {
+        this.afterBatch = afterBatch;
+    }
+
+    public void submit(Event event) {
+        if (!running) {
+            // Nobody would drain it, and a full queue would block forever
+            LOG.warning("[EsperFeeder] Stopped, dropping event for " + event.stream_id);
+            return;
+        }
+        try {
+            if (queue.offer(event)) return;
+
+            // Queue full: Esper is behind, upstream frames may start being dropped
+            long count = blocked.incrementAndGet();
+            if ((count & (count - 1)) == 0) { // log at 1, 2, 4, 8, ... to avoid flooding
+                LOG.warning("[EsperFeeder] Queue full, " + count + " blocked submits so far");
+            }
+            queue.put(event);
+        } catch (InterruptedException e) {
+            Thread.currentThread().interrupt();
+            LOG.warning("[EsperFeeder] Interrupted while queueing event");
+        }
+    }
+
+    public void submitAll(List<Event> events) {
+        for (Event event : events) {
+            submit(event);
+            if (Thread.currentThread().isInterrupted()) return;
+        }
+    }
+
+    public void start() {
+        running = true;
+        thread = new Thread(this, "esper-feeder");
+        thread.setDaemon(true);
+        thread.start();
+        LOG.info("[EsperFeeder] Started");
+    }
+
+    @Override
+    public void run() {
+        List<Event> batch = new ArrayList<>(drainSize); // reused across batches
+
+        // After stop(), keep going until the queue is empty
+        while (running || !queue.isEmpty()) {
+            try {
+                Event first = queue.poll(100, TimeUnit.MILLISECONDS);
+                if (first == null) continue;
+                batch.add(first);
+                queue.drainTo(batch, drainSize - 1);
+            } catch (InterruptedException e) {
+                LOG.warning("[EsperFeeder] Interrupted, dropping " + queue.size() + " queued events");
+                break;
+            }
+
+            for (Event event : batch) {
+                try {
+                    eventService.sendEventBean(event, "Event");
+                } catch (Exception e) {
+                    LOG.warning("[EsperFeeder] Failed to send event to Esper: " + e.getMessage());
+                }
+            }
+            processed.addAndGet(batch.size());
+            batch.clear();
+            runAfterBatch();
+        }
+        // Once more for matches Esper's timer thread produced since the last batch
+        runAfterBatch();
+        LOG.info("[EsperFeeder] Stopped");
+    }
+
+    private void runAfterBatch() {
+        try {
+            afterBatch.run();
+        } catch (Exception e) {
+            LOG.warning("[EsperFeeder] After-batch hook failed: " + e.getMessage());
+        }
+    }
+
+    /**
+     * Process every queued event, run the after-batch hook a last time and wait for the
+     * feeder thread to finish. Stop whatever calls submit() first.
+     */
+    public void stop() {
+        running = false;
+        if (thread == null) return;
+        try {
+            while (thread.isAlive()) {
+                thread.join(1000);
+                if (thread.isAlive()) {
+                    LOG.info("[EsperFeeder] Draining, " + queue.size() + " events left");
+                }
+            }
+        } catch (InterruptedException e) {
+            Thread.currentThread().interrupt();
+        }
+    }
+
+    public long getProcessed() {
+        return processed.get();
+    }
+
+    public int getBacklog() {
+        return queue.size();
+    }
+
+    public long getBlocked() {
+        return blocked.get();
+    }
+}
@@ -4,6 +4,8 @@ import org.zeromq.ZMQ;
 import java.nio.charset.StandardCharsets;
 import java.time.Duration;
 import java.util.UUID;
+import java.util.concurrent.CountDownLatch;
+import java.util.concurrent.TimeUnit;
 import java.util.logging.Level;
 import java.util.logging.Logger;
 
@@ -20,6 +22,7 @@ public abstract class Client {
     protected final ZMQ.Poller poller;
 
     private volatile boolean running = false;
+    private final CountDownLatch loopExited = new CountDownLatch(1);
 
     public Client() {
         this("tcp://localhost:5556", "tcp://localhost:5557", "tcp://localhost:5558");
@@ -71,28 +74,47 @@ public abstract class Client {
 
         long alarmNanos = System.nanoTime() + Duration.ofSeconds(1).toNanos();
 
-        while (running && !Thread.currentThread().isInterrupted()) {
-            long now = System.nanoTime();
-            long remainingMs = Math.max(0, (alarmNanos - now) / 1_000_000L);
-
-            try {
-                int rc = poller.poll((int) remainingMs);
-                if (rc > 0 && poller.pollin(0)) {
-                    subscriberAction();
-                }
-
-                if (System.nanoTime() >= alarmNanos) {
-                    timeoutAction();
-                    alarmNanos += Duration.ofSeconds(1).toNanos();
+        try {
+            while (running && !Thread.currentThread().isInterrupted()) {
+                long now = System.nanoTime();
+                long remainingMs = Math.max(0, (alarmNanos - now) / 1_000_000L);
+
+                try {
+                    int rc = poller.poll((int) remainingMs);
+                    if (rc > 0 && poller.pollin(0)) {
+                        subscriberAction();
+                    }
+
+                    if (System.nanoTime() >= alarmNanos) {
+                        timeoutAction();
+                        alarmNanos += Duration.ofSeconds(1).toNanos();
+                    }
+                } catch (Exception e) {
+                    LOG.log(Level.FINE, "Subscribe loop interrupted", e);
+                    break;
                 }
-            } catch (Exception e) {
-                LOG.log(Level.FINE, "Subscribe loop interrupted", e);
-                break;
             }
+        } finally {
+            loopExited.countDown();
         }
         LOG.fine("Interrupted");
     }
 
+    /** Stop the subscribe loop without closing the sockets, so publishing still works. */
+    public void stopReceiving() {
+        boolean wasRunning = running;
+        running = false;
+        if (!wasRunning) return;
+        try {
+            // The loop notices within one poll interval (at most a second)
+            if (!loopExited.await(2, TimeUnit.SECONDS)) {
+                LOG.warning("Subscribe loop did not stop in time");
+            }
+        } catch (InterruptedException e) {
+            Thread.currentThread().interrupt();
+        }
+    }
+
     /** Stop the subscribe loop and close sockets/context. */
     public void close() {
         running = false;
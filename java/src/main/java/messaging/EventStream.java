@@ -1,6 +1,7 @@
 package messaging;
 
 import event.Event;
+import java.util.List;
 import java.util.Map;
 import java.util.concurrent.ConcurrentHashMap;
 import java.util.function.Consumer;
@@ -10,12 +11,21 @@ public class EventStream {
     private static final Logger LOG = Logger.getLogger(EventStream.class.getName());
 
     private final StreamClient client;
+    // Python producers with shared memory rings publish their TCP copies under "<partition>~<namespace>"
+    private final String namespace;
 
     private final Map<String, Map<String, Consumer<Event>>> subscribers = new ConcurrentHashMap<>();
+    private final Map<String, Map<String, Consumer<List<Event>>>> batchSubscribers = new ConcurrentHashMap<>();
 
     public EventStream(StreamClient client) {
+        this(client, "sots");
+    }
+
+    public EventStream(StreamClient client, String namespace) {
         this.client = client;
+        this.namespace = namespace;
         this.client.setDispatcher(this::dispatchEvent); // hook back
+        this.client.setBatchDispatcher(this::dispatchBatch);
     }
 
     public void addEvent(String partition, String streamId, Event event) {
@@ -24,51 +34,85 @@ public class EventStream {
         LOG.info(() -> "[EventStream] Published " + topic + " -> " + event);
     }
 
+    public void addEvents(String partition, String streamId, List<Event> events) {
+        String topic = partition + "." + streamId;
+        client.publishBatch(topic, events);
+        LOG.fine(() -> "[EventStream] Published batch of " + events.size() + " to " + topic);
+    }
+
     public void subscribe(String partition, String streamId, Consumer<Event> handler) {
         subscribers
             .computeIfAbsent(partition, k -> new ConcurrentHashMap<>())
             .put(streamId, handler);
+        subscribeTopics(partition, streamId);
+    }
 
-        String prefix = partition + (streamId.equals("*") ? "." : "." + streamId);
-        client.subscribeTo(prefix);
+    /** Like subscribe, but receives each incoming batch as a whole (single events as one-element lists). */
+    public void subscribeBatch(String partition, String streamId, Consumer<List<Event>> handler) {
+        batchSubscribers
+            .computeIfAbsent(partition, k -> new ConcurrentHashMap<>())
+            .put(streamId, handler);
+        subscribeTopics(partition, streamId);
+    }
+
+    private void subscribeTopics(String partition, String streamId) {
+        String suffix = streamId.equals("*") ? "." : "." + streamId;
+        client.subscribeTo(partition + suffix);
+        client.subscribeTo(partition + "~" + namespace + suffix);
     }
 
+    /** Exact stream id match first, then the partition wildcard. */
+    private static <T> T resolve(Map<String, Map<String, T>> subs, String partition, String streamId) {
+        Map<String, T> partitionSubs = subs.get(partition);
+        if (partitionSubs == null) return null;
+        T handler = partitionSubs.get(streamId);
+        return handler != null ? handler : partitionSubs.get("*");
+    }
 
+    // Single frames and batch frames both reach per-event and batch subscribers
     private void dispatchEvent(String topic, Event event) {
+        dispatch(topic, List.of(event));
+    }
+
+    private void dispatchBatch(String topic, List<Event> events) {
+        dispatch(topic, events);
+    }
+
+    private void dispatch(String topic, List<Event> events) {
         String[] parts = topic.split("\\.", 2);
         if (parts.length < 2) return;
         String partition = parts[0];
         String streamId = parts[1];
+        int mirror = partition.indexOf('~');
+        if (mirror >= 0) partition = partition.substring(0, mirror);
 
-        Map<String, Consumer<Event>> partitionSubs = subscribers.get(partition);
-        if (partitionSubs == null) {
-            LOG.fine(() -> "[EventStream] No subscribers for partition " + partition);
-            return;
-        }
+        Consumer<List<Event>> batchHandler = resolve(batchSubscribers, partition, streamId);
+        Consumer<Event> handler = resolve(subscribers, partition, streamId);
 
-        // Exact match
-        Consumer<Event> handler = partitionSubs.get(streamId);
-        if (handler != null) {
-            handler.accept(event);
+        if (batchHandler == null && handler == null) {
+            LOG.fine(() -> "[EventStream] No handler for " + topic);
             return;
         }
-
-        // Wildcard match
-        Consumer<Event> wildcard = partitionSubs.get("*");
-        if (wildcard != null) {
-            wildcard.accept(event);
-            return;
+        if (batchHandler != null) {
+            batchHandler.accept(events);
+        }
+        if (handler != null) {
+            for (Event event : events) {
+                handler.accept(event);
+            }
         }
-
-        LOG.fine(() -> "[EventStream] No handler for " + topic);
     }
 
-
     public void start() {
         client.join();
         client.subscribe();
     }
 
+    /** Stop handing incoming events to subscribers; publishing keeps working until stop(). */
+    public void stopReceiving() {
+        client.stopReceiving();
+    }
+
     public void stop() {
         client.close();
         LOG.info("[EventStream] Stopped");
@@ -2,7 +2,12 @@ package messaging;
 
 import com.google.gson.Gson;
 import event.Event;
+import java.io.ByteArrayInputStream;
+import java.io.InputStreamReader;
+import java.io.Reader;
 import java.nio.charset.StandardCharsets;
+import java.util.Arrays;
+import java.util.List;
 import java.util.function.BiConsumer;
 import java.util.logging.Logger;
 
@@ -12,6 +17,7 @@ public class StreamClient extends Client {
 
     // Hook back to EventStream for dispatch
     private BiConsumer<String, Event> dispatcher;
+    private BiConsumer<String, List<Event>> batchDispatcher;
 
     public StreamClient() {
         super();
@@ -25,14 +31,38 @@ public class StreamClient extends Client {
         this.dispatcher = dispatcher;
     }
 
+    public void setBatchDispatcher(BiConsumer<String, List<Event>> batchDispatcher) {
+        this.batchDispatcher = batchDispatcher;
+    }
+
+    // Batches published by the Python EventStream are a JSON array in a single frame
+    private static boolean isBatch(byte[] payload) {
+        for (byte b : payload) {
+            if (!Character.isWhitespace(b)) return b == '[';
+        }
+        return false;
+    }
+
     @Override
     protected void subscriberAction() {
         try {
             String topic = subscriber.recvStr();
-            String payload = subscriber.recvStr();
-            Event event = gson.fromJson(payload, Event.class);
+            byte[] payload = subscriber.recv();
 
+            if (isBatch(payload)) {
+                Event[] events;
+                try (Reader reader = new InputStreamReader(new ByteArrayInputStream(payload), StandardCharsets.UTF_8)) {
+                    events = gson.fromJson(reader, Event[].class);
+                }
+                LOG.fine(() -> "[StreamClient] Received batch of " + events.length + " on topic " + topic);
 
+                if (batchDispatcher != null) {
+                    batchDispatcher.accept(topic, Arrays.asList(events));
+                }
+                return;
+            }
+
+            Event event = gson.fromJson(new String(payload, StandardCharsets.UTF_8), Event.class);
             LOG.fine(() -> "[StreamClient] Received on topic " + topic + ": " + event);
 
             // Forward to EventStream if attached
@@ -66,4 +96,11 @@ public class StreamClient extends Client {
         publisher.send(payload.getBytes(StandardCharsets.UTF_8));
         LOG.fine(() -> "[StreamClient] Published on topic " + topic + ": " + event);
     }
+
+    public void publishBatch(String topic, List<Event> events) {
+        String payload = gson.toJson(events);
+        publisher.sendMore(topic);
+        publisher.send(payload.getBytes(StandardCharsets.UTF_8));
+        LOG.fine(() -> "[StreamClient] Published batch of " + events.size() + " on topic " + topic);
+    }
 }
@@ -21,7 +21,16 @@ import messaging.EventStream;
 import event.Event;
 import messaging.StreamClient;
 
+import java.util.ArrayList;
 import java.util.HashMap;
+import java.util.LinkedHashMap;
+import java.util.List;
+import java.util.Map;
+import java.util.Queue;
+import java.util.concurrent.ConcurrentLinkedQueue;
+import java.util.concurrent.Executors;
+import java.util.concurrent.ScheduledExecutorService;
+import java.util.concurrent.TimeUnit;
 
 public class PatternLoader {
     private static final Logger LOG = Logger.getLogger(PatternLoader.class.getName());
@@ -32,6 +41,11 @@ public class PatternLoader {
     private final EventStream eventStream;
     private final Gson gson = new Gson();
 
+    // Listeners run on the feeder thread, and on Esper's timer thread for time-based
+    // statements, so matches are queued here and published together by flushMatches()
+    private final Queue<Event> pendingMatches = new ConcurrentLinkedQueue<>();
+    private volatile ScheduledExecutorService flushTimer;
+
     public PatternLoader(Configuration configuration, EPRuntime runtime, EventStream eventStream) {
         this.args = new CompilerArguments(configuration);
         this.runtime = runtime;
@@ -89,9 +103,58 @@ public class PatternLoader {
             // Add/overwrite pattern metadata
             outEvent.extras.put("pattern", name);
 
-            // publish to matched partition
-            eventStream.addEvent("matched", outEvent.stream_id, outEvent);
-            LOG.info(() -> "[CEP] Pattern match (" + name + ") for stream " + outEvent.stream_id);
+            // queued for the matched partition
+            pendingMatches.add(outEvent);
+            LOG.fine(() -> "[CEP] Pattern match (" + name + ") for stream " + outEvent.stream_id);
         });
     }
+
+    /**
+     * Publish queued matches to the matched partition, one batch per stream.
+     * Called after every input batch (see CEPManager.onBatchProcessed) and by the flush timer;
+     * synchronized because the publisher socket must only be used by one thread at a time.
+     */
+    public synchronized void flushMatches() {
+        if (pendingMatches.isEmpty()) return;
+
+        Map<String, List<Event>> byStream = new LinkedHashMap<>();
+        Event match;
+        while ((match = pendingMatches.poll()) != null) {
+            byStream.computeIfAbsent(match.stream_id, k -> new ArrayList<>()).add(match);
+        }
+        for (Map.Entry<String, List<Event>> entry : byStream.entrySet()) {
+            eventStream.addEvents("matched", entry.getKey(), entry.getValue());
+            LOG.info("[CEP] Published " + entry.getValue().size() + " matches for stream " + entry.getKey());
+        }
+    }
+
+    /** Also flush every intervalMs, for matches of time-based statements while no input arrives. */
+    public void startFlushTimer(long intervalMs) {
+        flushTimer = Executors.newSingleThreadScheduledExecutor(r -> {
+            Thread thread = new Thread(r, "match-flusher");
+            thread.setDaemon(true);
+            return thread;
+        });
+        flushTimer.scheduleWithFixedDelay(() -> {
+            try {
+                flushMatches();
+            } catch (Exception e) {
+                // An exception would cancel every later run
+                LOG.warning("[CEP] Failed to flush matches: " + e.getMessage());
+            }
+        }, intervalMs, intervalMs, TimeUnit.MILLISECONDS);
+    }
+
+    /** Stop the flush timer and publish what is still queued. */
+    public void stop() {
+        if (flushTimer != null) {
+            flushTimer.shutdown();
+            try {
+                flushTimer.awaitTermination(1, TimeUnit.SECONDS);
+            } catch (InterruptedException e) {
+                Thread.currentThread().interrupt();
+            }
+        }
+        flushMatches();
+    }
 }
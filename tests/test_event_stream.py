@@ -0,0 +1,70 @@
+import time
+from app.messaging.EventStream import EventStream
+
+
+class RecordingClient:
+    def __init__(self):
+        self.single = []
+        self.batches = []
+        self.subscribers = {}
+
+    def publish(self, event, stream_id, mirror=False):
+        self.single.append((stream_id, event))
+
+    def publish_batch(self, events, stream_id, mirror=False):
+        self.batches.append((stream_id, [e["value"] for e in events]))
+
+
+def test_add_event_batches_per_stream():
+    stream = EventStream(batch_size=3, max_linger_ms=60_000)
+    client = RecordingClient()
+    stream.partitions["imputed"] = client
+
+    for value in range(4):
+        stream.add_event({"value": value}, "imputed", "temp-1")
+    stream.add_event({"value": 10}, "imputed", "humid-1")
+
+    assert client.batches == [("temp-1", [0, 1, 2])]
+
+    stream.close()
+    assert sorted(client.batches[1:]) == [("humid-1", [10]), ("temp-1", [3])]
+    assert client.single == []
+
+
+def test_batch_size_one_publishes_immediately():
+    stream = EventStream()
+    client = RecordingClient()
+    stream.partitions["observed"] = client
+
+    stream.add_event({"value": 1.0}, "observed", "temp-1")
+    assert client.single == [("temp-1", {"value": 1.0})]
+    assert client.batches == []
+
+
+def test_only_batch_partitions_are_batched():
+    stream = EventStream(batch_size=4, max_linger_ms=60_000)
+    observed, imputed = RecordingClient(), RecordingClient()
+    stream.partitions["observed"] = observed
+    stream.partitions["imputed"] = imputed
+
+    stream.add_event({"value": 1.0}, "observed", "temp-1")
+    stream.add_event({"value": 1.0}, "imputed", "temp-1")
+
+    assert observed.single == [("temp-1", {"value": 1.0})]
+    assert imputed.single == [] and imputed.batches == []
+    stream.close()
+
+
+def test_partial_batch_is_sent_after_linger_without_dispatch():
+    stream = EventStream(batch_size=4, max_linger_ms=20)
+    client = RecordingClient()
+    stream.partitions["imputed"] = client
+
+    for value in range(3):
+        stream.add_event({"value": value}, "imputed", "temp-1")
+
+    deadline = time.monotonic() + 2.0
+    while not client.batches and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert client.batches == [("temp-1", [0, 1, 2])]
+    stream.close()
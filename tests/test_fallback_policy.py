@@ -0,0 +1,146 @@
+import json
+import time
+from app.imputation.FallbackPolicy import FallbackPolicy
+from app.imputation.ImputersManager import ImputerManager
+
+
+class FakeEventStream:
+    def __init__(self):
+        self.events = []
+
+    def subscribe(self, consumer, partition, stream_id):
+        pass
+
+    def add_event(self, event, partition, stream_id):
+        self.events.append(event)
+
+
+def make_manager(tmp_path, policy):
+    streams = {
+        "temp-1": {"filter_template": "kf1", "fallback_template": "last"},
+        "humid-1": {"filter_template": "kf1", "fallback_template": "last", "priority": "low"},
+        "wind-1": {"filter_template": "kf1"},
+    }
+    filters = {
+        "kf1": {"type": "KalmanFilter", "params": {"initial_value": 20.0}},
+        "last": {"type": "LastValuePredictor", "params": {}},
+    }
+    (tmp_path / "streams.json").write_text(json.dumps(streams))
+    (tmp_path / "filters.json").write_text(json.dumps(filters))
+    return ImputerManager(FakeEventStream(), str(tmp_path / "streams.json"),
+                          str(tmp_path / "filters.json"), policy=policy)
+
+
+def set_load(worker, event_cost, input_rate, lag=0.0):
+    worker.event_cost = event_cost
+    worker.busy_cost = event_cost
+    worker.lag = lag
+    worker._rate = input_rate
+    worker._last_arrival = time.perf_counter()
+
+
+def test_degrades_low_priority_stream_first_and_restores(tmp_path):
+    manager = make_manager(tmp_path, FallbackPolicy(high_rate=1000.0, settle_events=0))
+    workers = manager.workers
+    for worker in workers.values():
+        set_load(worker, 0.01, 40.0)  # 3 x 0.4 load
+
+    workers["humid-1"].consume_event({"stream_id": "humid-1", "value": 55.0})
+    set_load(workers["humid-1"], 0.01, 40.0)
+    manager.rebalance()
+    assert workers["humid-1"].predictor.name == "last"
+    assert workers["humid-1"].predictor.value == 55.0
+    assert workers["temp-1"].predictor.name == "kalman"
+
+    # temp-1 is normal priority and not high rate, wind-1 has no fallback
+    manager.rebalance()
+    assert workers["temp-1"].predictor.name == "kalman"
+
+    for worker in workers.values():
+        set_load(worker, 0.001, 40.0)
+    manager.rebalance()
+    assert workers["humid-1"].predictor.name == "kalman"
+
+
+def test_high_rate_stream_is_eligible(tmp_path):
+    manager = make_manager(tmp_path, FallbackPolicy(high_rate=100.0, settle_events=0))
+    set_load(manager.workers["temp-1"], 0.01, 200.0)
+    manager.rebalance()
+    assert manager.workers["humid-1"].predictor.name == "last"
+    assert manager.workers["temp-1"].predictor.name == "kalman"
+
+    manager.rebalance()
+    assert manager.workers["temp-1"].predictor.name == "last"
+
+
+def test_imputer_measures_load(tmp_path):
+    manager = make_manager(tmp_path, FallbackPolicy())
+    worker = manager.workers["temp-1"]
+    for value in (20.0, None, 21.0):
+        worker.consume_event({"stream_id": "temp-1", "value": value})
+    assert worker.event_cost > 0.0
+    assert worker.input_rate > 0.0
+    assert worker.last_observed == 21.0
+
+
+def test_swap_projects_cost_and_settles_before_next_decision(tmp_path):
+    manager = make_manager(tmp_path, FallbackPolicy(high_rate=100.0))
+    workers = manager.workers
+    set_load(workers["humid-1"], 0.01, 200.0)
+    set_load(workers["temp-1"], 0.01, 200.0)
+
+    manager.rebalance()
+    assert workers["humid-1"].predictor.name == "last"
+    # Projected from the reported costs until the cheap predictor is measured
+    assert workers["humid-1"].event_cost == 0.01 * 0.01
+
+    # Still settling: temp-1 is not degraded on the back of stale measurements
+    manager.rebalance()
+    assert workers["temp-1"].predictor.name == "kalman"
+
+
+def test_input_rate_decays_when_stream_goes_quiet(tmp_path):
+    manager = make_manager(tmp_path, FallbackPolicy())
+    worker = manager.workers["temp-1"]
+    set_load(worker, 0.01, 200.0)
+    worker._last_arrival -= 2.0
+    assert worker.input_rate <= 0.5
+
+
+class SlowEventStream(FakeEventStream):
+    def add_event(self, event, partition, stream_id):
+        time.sleep(0.002)  # publishing dominates the predictor
+        super().add_event(event, partition, stream_id)
+
+
+def test_utilization_counts_whole_event_and_source_rate(tmp_path):
+    manager = make_manager(tmp_path, FallbackPolicy())
+    worker = manager.workers["temp-1"]
+    worker.event_stream = SlowEventStream()
+
+    # Produced at 1000 events/s but drained from a backlog at < 500 events/s
+    start = time.time() - 1.0
+    for i in range(20):
+        worker.consume_event({"stream_id": "temp-1", "value": 20.0, "timestamp": start + i * 0.001})
+
+    assert worker.busy_cost >= 0.002 > worker.event_cost
+    assert worker.input_rate > 900.0
+    assert worker.utilization > 1.0
+    assert worker.lag >= 1.0
+
+
+def test_lag_triggers_degrade_under_low_measured_load(tmp_path):
+    manager = make_manager(tmp_path, FallbackPolicy(high_rate=1000.0, settle_events=0, max_lag=0.5))
+    workers = manager.workers
+    for worker in workers.values():
+        set_load(worker, 0.001, 10.0)
+    set_load(workers["temp-1"], 0.001, 10.0, lag=2.0)
+
+    manager.rebalance()
+    assert workers["humid-1"].predictor.name == "last"
+
+    # Lag gone but load not below the low watermark yet: no restore
+    for worker in workers.values():
+        set_load(worker, 0.02, 10.0)
+    manager.rebalance()
+    assert workers["humid-1"].predictor.name == "last"
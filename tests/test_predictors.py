@@ -1,5 +1,7 @@
 import pytest
-from app.imputation.predictors.Predictor import KalmanFilter
+from app.imputation.predictors.Predictor import (
+    KalmanFilter, LastValuePredictor, EWMAPredictor, LinearExtrapolationPredictor, create_predictor
+)
 
 def test_kalman_filter_stability():
     predictor = KalmanFilter()
@@ -20,3 +22,45 @@ def test_kalman_filter_stability():
 
     value = predictor.get_value()
     assert abs(value - 5.0) < 1.0  # something close to this
+
+
+def test_create_predictor_from_registry():
+    predictor = create_predictor("LastValuePredictor", {})
+    assert isinstance(predictor, LastValuePredictor)
+    assert isinstance(create_predictor("KalmanFilter", {"initial_value": 1.0}), KalmanFilter)
+
+    with pytest.raises(ValueError):
+        create_predictor("Unknown", {})
+
+
+def test_cheap_predictors_are_cheaper_than_kalman():
+    for cls in (LastValuePredictor, EWMAPredictor, LinearExtrapolationPredictor):
+        assert cls.cost < KalmanFilter.cost
+
+
+def test_last_value_predictor():
+    predictor = LastValuePredictor()
+    predictor.predict()
+    predictor.update(3.0)
+    assert predictor.predict() == 3.0
+    first = predictor.confidence()
+    predictor.predict()
+    assert predictor.confidence() < first
+
+
+def test_ewma_predictor_smooths_toward_observations():
+    predictor = EWMAPredictor(initial_value=0.0, alpha=0.5)
+    predictor.predict()
+    assert predictor.update(4.0) == 2.0
+    assert predictor.predict() == 2.0
+
+
+def test_linear_extrapolation_follows_trend():
+    predictor = LinearExtrapolationPredictor(window=4)
+    for value in (1.0, 2.0, 3.0, 4.0):
+        predictor.predict()
+        predictor.update(value)
+
+    assert predictor.predict() == pytest.approx(5.0)
+    assert predictor.predict() == pytest.approx(6.0)
+    assert 0.0 <= predictor.confidence() <= 1.0
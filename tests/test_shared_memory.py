@@ -0,0 +1,255 @@
+import multiprocessing
+import time
+import uuid
+from multiprocessing import shared_memory
+import pytest
+import zmq
+from app.messaging.Client import Client
+from app.messaging.EventStream import EventStream
+from app.messaging.SharedMemoryClient import (
+    SharedRing, RingOverrun, RingBusy, RecordTooLarge, SharedMemoryClient
+)
+from app.schema.Event import EventConsumer
+
+
+class Collector(EventConsumer):
+    def __init__(self):
+        self.events = []
+
+    def consume_event(self, event):
+        self.events.append(event)
+
+
+def test_ring_roundtrip_and_overrun():
+    name = f"sots-test-{uuid.uuid4().hex[:8]}"
+    producer = SharedRing(name, capacity=4, slot_size=128, create=True)
+    reader = SharedRing(name)
+    try:
+        assert reader.capacity == 4 and reader.slot_size == 128
+        assert reader.read(1) is None
+
+        seq = producer.write(b"observed.temp-1", b'{"value": 1.0}')
+        assert seq == 1
+        assert reader.read(1) == (b"observed.temp-1", b'{"value": 1.0}')
+
+        for i in range(4):
+            producer.write(b"observed.temp-1", str(i).encode())
+        with pytest.raises(RingOverrun):
+            reader.read(1)
+
+        with pytest.raises(RecordTooLarge):
+            producer.write(b"observed.temp-1", b"x" * 200)
+    finally:
+        reader.close()
+        producer.close()
+
+
+def test_doorbell_only_rings_for_armed_readers():
+    name = f"sots-test-{uuid.uuid4().hex[:8]}"
+    producer = SharedRing(name, capacity=4, slot_size=128, create=True)
+    reader = SharedRing(name)
+    try:
+        # Armed at creation for readers that joined before the first write
+        assert producer.disarm()
+        # Rest of the burst: nobody went back to sleep, no doorbell
+        assert not producer.disarm()
+        reader.arm()
+        assert producer.disarm()
+    finally:
+        reader.close()
+        producer.close()
+
+
+def test_client_dispatches_to_subscribers(tmp_path):
+    namespace = f"sots-test-{uuid.uuid4().hex[:8]}"
+    client = SharedMemoryClient("observed", namespace=namespace, capacity=8, slot_size=256,
+                                doorbell_dir=str(tmp_path))
+    exact, wildcard = Collector(), Collector()
+    client.subscribe_to("temp-1", exact)
+    client.subscribe_to("*", wildcard)
+    try:
+        client.dispatch_once(timeout=0)
+        client.publish({"stream_id": "temp-1", "value": 21.5}, "temp-1")
+        client.publish({"stream_id": "humid-1", "value": 60.0}, "humid-1")
+        client.dispatch_once(timeout=100)
+
+        assert [e["value"] for e in exact.events] == [21.5]
+        assert [e["__topic__"] for e in wildcard.events] == ["observed.temp-1", "observed.humid-1"]
+    finally:
+        client.close()
+
+
+def test_reader_waits_for_segment_being_set_up(tmp_path):
+    namespace = f"sots-test-{uuid.uuid4().hex[:8]}"
+    # Sized but header not written yet, as seen mid-way through a producer start
+    segment = shared_memory.SharedMemory(name=f"{namespace}-observed", create=True, size=4096)
+    reader = SharedMemoryClient("observed", namespace=namespace, doorbell_dir=str(tmp_path))
+    collector = Collector()
+    try:
+        reader.subscribe_to("temp-1", collector)
+        reader.dispatch_once(timeout=0)
+        assert collector.events == []
+    finally:
+        reader.close()
+        segment.close()
+        segment.unlink()
+
+
+def _second_producer(namespace, doorbell_dir, result):
+    client = SharedMemoryClient("observed", namespace=namespace, doorbell_dir=doorbell_dir)
+    try:
+        client.publish({"value": 2.0}, "temp-1")
+        result.put("published")
+    except RingBusy:
+        result.put("busy")
+    finally:
+        client.close()
+
+
+def test_second_producer_process_is_rejected(tmp_path):
+    namespace = f"sots-test-{uuid.uuid4().hex[:8]}"
+    producer = SharedMemoryClient("observed", namespace=namespace, doorbell_dir=str(tmp_path))
+    reader = SharedMemoryClient("observed", namespace=namespace, doorbell_dir=str(tmp_path))
+    collector = Collector()
+    reader.subscribe_to("*", collector)
+    try:
+        producer.publish({"value": 1.0}, "temp-1")
+
+        ctx = multiprocessing.get_context("spawn")
+        result = ctx.Queue()
+        process = ctx.Process(target=_second_producer, args=(namespace, str(tmp_path), result))
+        process.start()
+        process.join(30)
+        assert result.get(timeout=5) == "busy"
+
+        # The first producer's ring is untouched and still usable
+        producer.publish({"value": 3.0}, "temp-1")
+        reader.dispatch_once(timeout=100)
+        assert [e["value"] for e in collector.events] == [1.0, 3.0]
+    finally:
+        reader.close()
+        producer.close()
+
+
+def test_reader_follows_restarted_producer(tmp_path):
+    namespace = f"sots-test-{uuid.uuid4().hex[:8]}"
+    reader = SharedMemoryClient("observed", namespace=namespace, doorbell_dir=str(tmp_path),
+                                probe_interval=0.0)
+    collector = Collector()
+    reader.subscribe_to("*", collector)
+    try:
+        for values in ([0, 1, 2], [3, 4]):
+            producer = SharedMemoryClient("observed", namespace=namespace, doorbell_dir=str(tmp_path))
+            for value in values:
+                producer.publish({"value": value}, "temp-1")
+            reader.dispatch_once(timeout=100)
+            producer.close()
+            reader.dispatch_once(timeout=0)
+
+        assert [e["value"] for e in collector.events] == [0, 1, 2, 3, 4]
+    finally:
+        reader.close()
+
+
+class RecordingClient:
+    def __init__(self):
+        self.published = []
+        self.mirrored = []
+        self.subscribers = {}
+        self.socket = zmq.Context.instance().socket(zmq.PAIR)  # pollable, never readable
+        self.socket.linger = 0
+
+    def publish(self, event, stream_id, mirror=False):
+        (self.mirrored if mirror else self.published).append(dict(event))
+
+    def subscribe_to(self, stream_id, consumer, mirrors=True):
+        self.subscribers.setdefault(stream_id, []).append((consumer, mirrors))
+
+    def dispatch_once(self, timeout=1000):
+        pass
+
+
+def test_event_stream_mirrors_under_separate_topic(tmp_path):
+    namespace = f"sots-test-{uuid.uuid4().hex[:8]}"
+    stream = EventStream(shared_memory=True, namespace=namespace, slot_size=256, doorbell_dir=str(tmp_path))
+    tcp = RecordingClient()
+    stream.partitions["matched"] = tcp
+    collector = Collector()
+    stream.subscribe(collector, "matched", "*")
+    try:
+        # Ring subscribers still listen on TCP, but not for mirrored copies
+        assert tcp.subscribers["*"] == [(collector, False)]
+
+        stream.add_event({"value": 1.0}, "matched", "temp-1")
+        stream.dispatch(timeout=100, once=True)
+        assert [e["value"] for e in collector.events] == [1.0]
+        assert [e["value"] for e in tcp.mirrored] == [1.0] and tcp.published == []
+
+        # Too large for a slot: plain TCP topic, so ring subscribers receive it there
+        stream.add_event({"value": 3.0, "extras": {"blob": "x" * 400}}, "matched", "temp-1")
+        assert [e["value"] for e in tcp.published] == [3.0]
+    finally:
+        stream.close()
+
+
+def test_client_filters_mirrored_copies_in_zeromq():
+    ctx = zmq.Context.instance()
+    server = ctx.socket(zmq.PUB)
+    server.linger = 0
+    try:
+        server.bind("tcp://*:5557")
+    except zmq.ZMQError:
+        server.close()
+        pytest.skip("event bus port 5557 is in use")
+
+    ring_side, plain_side = Client("matched"), Client("matched")
+    ring_collector, plain_collector = Collector(), Collector()
+    ring_side.subscribe_to("*", ring_collector, mirrors=False)
+    plain_side.subscribe_to("temp-1", plain_collector)
+    try:
+        time.sleep(0.2)  # let the subscriptions reach the PUB socket
+        server.send_multipart([b"matched~sots.temp-1", b'{"value": 1.0}'])
+        server.send_multipart([b"matched.temp-1", b'{"value": 2.0}'])
+        for client in (ring_side, plain_side):
+            for _ in range(2):
+                client.dispatch_once(timeout=200)
+
+        assert [e["value"] for e in ring_collector.events] == [2.0]
+        assert [e["value"] for e in plain_collector.events] == [1.0, 2.0]
+        assert {e["__topic__"] for e in plain_collector.events} == {"matched.temp-1"}
+    finally:
+        server.close()
+
+
+def test_second_event_stream_producer_falls_back_to_tcp(tmp_path):
+    namespace = f"sots-test-{uuid.uuid4().hex[:8]}"
+    first = EventStream(shared_memory=True, namespace=namespace, doorbell_dir=str(tmp_path))
+    second = EventStream(shared_memory=True, namespace=namespace, doorbell_dir=str(tmp_path))
+    tcp = RecordingClient()
+    second.partitions["observed"] = tcp
+    try:
+        first.add_event({"value": 1.0}, "observed", "temp-1")
+        # The ring is owned by the first stream: sent over TCP instead of raising
+        second.add_event({"value": 2.0}, "observed", "temp-1")
+        second.add_event({"value": 3.0}, "observed", "temp-1")
+        assert [e["value"] for e in tcp.published] == [2.0, 3.0]
+        assert tcp.mirrored == []
+    finally:
+        second.close()
+        first.close()
+
+
+def test_ring_event_is_not_held_back_by_quiet_tcp_sockets(tmp_path):
+    namespace = f"sots-test-{uuid.uuid4().hex[:8]}"
+    stream = EventStream(shared_memory=True, namespace=namespace, doorbell_dir=str(tmp_path))
+    collectors = {partition: Collector() for partition in stream.partitions}
+    for partition, collector in collectors.items():
+        stream.subscribe(collector, partition, "*")
+    try:
+        stream.add_event({"value": 1.0}, "matched", "temp-1")
+        started = time.monotonic()
+        stream.dispatch(timeout=2000, once=True)
+        assert time.monotonic() - started < 0.5
+        assert [e["value"] for e in collectors["matched"].events] == [1.0]
+    finally:
+        stream.close()
@@ -0,0 +1,61 @@
+import numpy as np
+from app.imputation.predictors.Predictor import KalmanFilter
+from app.imputation.Tuning import BatchKalmanFilter, replay, random_candidates, tune
+
+
+def test_batch_kalman_matches_kalman_filter():
+    candidates = random_candidates(4, seed=1)
+    observed = np.array([20.0, 21.0, np.nan, 22.5, np.nan, np.nan, 23.0])
+    masks = ~np.isnan(observed)[None, :]
+
+    batch = replay(observed, masks, candidates, {"initial_value": 20.0, "dt": 1.0})
+
+    for i, params in enumerate(candidates):
+        kf = KalmanFilter(initial_value=20.0, **params)
+        for t, value in enumerate(observed):
+            assert np.isclose(batch[i, 0, t], kf.predict())
+            if not np.isnan(value):
+                kf.update(value)
+
+
+def test_batch_kalman_update_only_touches_observed_rows():
+    kf = BatchKalmanFilter([0.01, 0.01], [0.1, 0.1], [1.0, 1.0])
+    kf.predict()
+    values = kf.update(5.0, np.array([True, False]))
+    assert values[0] > 0.0
+    assert values[1] == 0.0
+
+
+def test_tune_writes_template_per_stream_type(tmp_path):
+    rng = np.random.default_rng(0)
+    rows = ["partition,stream_id,timestamp,observed_value,extras"]
+    for t in range(60):
+        for stream_id, level in (("temp-1", 20.0), ("temp-2", 22.0)):
+            truth = level + 0.1 * t + rng.normal(0, 0.2)
+            observed = "" if rng.random() < 0.3 else truth
+            rows.append(f"observed,{stream_id},{t},{observed},\"{{'ground_truth': {truth}}}\"")
+    csv_path = tmp_path / "log.csv"
+    csv_path.write_text("\n".join(rows))
+
+    streams = {
+        "temp-1": {"stream_type": "temperature", "filter_template": "kf1"},
+        "temp-2": {"stream_type": "temperature", "filter_template": "kf1"},
+    }
+    filters = {"kf1": {"type": "KalmanFilter", "params": {"initial_value": 20.0}}}
+
+    tuned, scores = tune(str(csv_path), streams, filters, random_candidates(16), n_masks=2, workers=1)
+
+    assert set(tuned) == {"kf1", "tuned-temperature"}
+    assert tuned["tuned-temperature"]["type"] == "KalmanFilter"
+    assert set(scores["stream_id"]) == {"temp-1", "temp-2"}
+    assert len(scores) == 32
+    # Written template is the scored one: base params plus the tuned values
+    assert tuned["tuned-temperature"]["params"]["initial_value"] == 20.0
+
+    streams["temp-2"]["filter_template"] = "kf2"
+    filters["kf2"] = {"type": "KalmanFilter", "params": {"initial_value": 22.0}}
+    tuned, _ = tune(str(csv_path), streams, filters, random_candidates(16), n_masks=2, workers=1)
+
+    assert tuned["tuned-temperature-kf1"]["params"]["initial_value"] == 20.0
+    assert tuned["tuned-temperature-kf2"]["params"]["initial_value"] == 22.0
+    assert "tuned-temperature" not in tuned